@@ -0,0 +1,710 @@
+# Each algorithm is a generator that sorts `array` in place and yields one
+# step event per operation, *after* performing it, as an (op, a, b) tuple:
+#
+#   (COMPARE, i, j)    array[i] was compared with array[j]
+#   (SWAP, i, j)       array[i] and array[j] were exchanged
+#   (WRITE, i, value)  array[i] was overwritten with value
+#   (SORTED, lo, hi)   array[lo:hi] is in its final position
+#   (PIVOT, i, 0)      array[i] is the current pivot/key (-1 clears it)
+#   (SEGMENT, lo, hi)  array[lo:hi] belongs to the next worker/bucket; the
+#                      k-th segment since the last (SEGMENT, 0, 0) gets the
+#                      k-th segment colour, and (SEGMENT, 0, 0) clears them
+#   (AUX, k, 0)        k elements of auxiliary buffer were allocated (k < 0:
+#                      freed), e.g. merge's copy of the left run
+#
+# Replaying the SWAP and WRITE events against a copy of the input reproduces
+# the sorted array, so consumers never need to look at the array itself.
+
+COMPARE = 0
+SWAP = 1
+WRITE = 2
+SORTED = 3
+PIVOT = 4
+SEGMENT = 5
+AUX = 6
+
+
+def bubble_sort(array):
+    n = len(array)
+    for i in range(n):
+        swapped = False
+        for j in range(0, n - i - 1):
+            yield COMPARE, j, j + 1
+
+            if array[j] > array[j + 1]:
+                array[j], array[j + 1] = array[j + 1], array[j]
+                swapped = True
+                yield SWAP, j, j + 1
+
+        yield SORTED, n - i - 1, n - i
+        if not swapped:
+            break
+
+    yield SORTED, 0, n
+
+
+def selection_sort(array):
+    n = len(array)
+    for i in range(n):
+        min_idx = i
+        yield PIVOT, min_idx, 0
+
+        for j in range(i + 1, n):
+            yield COMPARE, j, min_idx
+
+            if array[j] < array[min_idx]:
+                min_idx = j
+                yield PIVOT, min_idx, 0
+
+        if min_idx != i:
+            array[i], array[min_idx] = array[min_idx], array[i]
+            yield SWAP, i, min_idx
+
+        yield SORTED, i, i + 1
+
+    yield PIVOT, -1, 0
+
+
+def insertion_sort(array):
+    for i in range(1, len(array)):
+        key = array[i]
+        j = i - 1
+        yield PIVOT, i, 0
+
+        while j >= 0:
+            yield COMPARE, j, j + 1
+            if array[j] <= key:
+                break
+
+            array[j + 1] = array[j]
+            yield WRITE, j + 1, array[j]
+            j -= 1
+
+        if j + 1 != i:
+            array[j + 1] = key
+            yield WRITE, j + 1, key
+
+        yield SORTED, 0, i + 1
+
+    yield PIVOT, -1, 0
+    yield SORTED, 0, len(array)
+
+
+def merge_sort(array):
+    yield from _merge_sort(array, 0, len(array))
+    yield SORTED, 0, len(array)
+
+
+def _merge_sort(array, lo, hi):
+    if hi - lo < 2:
+        return
+
+    mid = (lo + hi) // 2
+    yield from _merge_sort(array, lo, mid)
+    yield from _merge_sort(array, mid, hi)
+    yield from _merge(array, lo, mid, hi)
+
+
+def bottom_up_merge_sort(array):
+    n = len(array)
+    width = 1
+    while width < n:
+        for lo in range(0, n - width, 2 * width):
+            yield from _merge(array, lo, lo + width, min(lo + 2 * width, n))
+        width *= 2
+
+    yield SORTED, 0, n
+
+
+def _merge(array, lo, mid, hi):
+    # Only the left run is copied out: the write position never overtakes the
+    # right run's read position, so the right run can be merged from in place.
+    # list() because slicing an ndarray gives a view, not a copy.
+    left = list(array[lo:mid])
+    yield AUX, len(left), 0
+    i, j, k = 0, mid, lo
+
+    while i < len(left) and j < hi:
+        yield COMPARE, k, j
+        if array[j] < left[i]:
+            array[k] = array[j]
+            j += 1
+        else:
+            array[k] = left[i]
+            i += 1
+        yield WRITE, k, array[k]
+        k += 1
+
+    while i < len(left):
+        array[k] = left[i]
+        yield WRITE, k, left[i]
+        i += 1
+        k += 1
+
+    yield AUX, -len(left), 0
+
+
+def quick_sort(array):
+    yield from _quick_sort(array, len(array))
+
+
+def partial_quick_sort(array, k=None):
+    # Sorts only the k smallest into array[:k] (C++'s std::partial_sort
+    # contract): partitions lying wholly past k are never entered.
+    yield from _quick_sort(array, select_k(len(array), k))
+
+
+def _quick_sort(array, limit):
+    # Median-of-three pivot with a three-way partition, so runs of equal keys
+    # are finished in one pass. The smaller side is always handled first,
+    # which keeps the explicit stack at O(log n). Ranges starting at or past
+    # `limit` are left unsorted.
+    stack = [(0, len(array) - 1)]
+    while stack:
+        lo, hi = stack.pop()
+        if lo >= limit:
+            continue
+        if hi <= lo:
+            if hi == lo:
+                yield SORTED, lo, lo + 1
+            continue
+
+        if hi - lo >= 2:
+            mid = yield from _median_of_three(array, lo, hi)
+            yield _swap(array, lo, mid)
+
+        lt, gt = yield from _partition3(array, lo, hi)
+        yield SORTED, lt, gt + 1
+
+        if lt - lo < hi - gt:
+            stack.append((gt + 1, hi))
+            stack.append((lo, lt - 1))
+        else:
+            stack.append((lo, lt - 1))
+            stack.append((gt + 1, hi))
+
+    yield PIVOT, -1, 0
+
+
+def _partition3(array, lo, hi):
+    # Bentley-McIlroy partition around array[lo]: scan from both ends like
+    # Hoare, parking keys equal to the pivot at the two ends, then swap them
+    # into the middle. Returns the bounds of the block equal to the pivot,
+    # which is final and left out of both sides, so each distinct key is
+    # partitioned around once however often it repeats. On presorted input
+    # the scans cross without exchanging anything; the only swaps are the
+    # two that move the pivot (to lo, then into place), per partition.
+    pivot = array[lo]
+    yield PIVOT, lo, 0
+
+    i, j = lo, hi + 1
+    p, q = lo, hi + 1
+    while True:
+        i += 1
+        while True:
+            yield COMPARE, i, lo
+            if not array[i] < pivot or i == hi:
+                break
+            i += 1
+
+        j -= 1
+        while True:
+            yield COMPARE, lo, j
+            if not pivot < array[j] or j == lo:
+                break
+            j -= 1
+
+        if i == j:
+            yield COMPARE, i, lo
+            if array[i] == pivot:
+                p += 1
+                if p != i:
+                    yield _swap(array, p, i)
+        if i >= j:
+            break
+
+        yield _swap(array, i, j)
+        yield COMPARE, i, lo
+        if array[i] == pivot:
+            p += 1
+            if p != i:
+                yield _swap(array, p, i)
+        yield COMPARE, j, lo
+        if array[j] == pivot:
+            q -= 1
+            if q != j:
+                yield _swap(array, q, j)
+
+    i = j + 1
+    for k in range(lo, p + 1):
+        if k != j:
+            yield _swap(array, k, j)
+        j -= 1
+    for k in range(hi, q - 1, -1):
+        if k != i:
+            yield _swap(array, k, i)
+        i += 1
+
+    return j + 1, i - 1
+
+
+def _median_of_three(array, lo, hi):
+    # Orders array[lo] <= array[mid] <= array[hi] and returns mid.
+    mid = (lo + hi) // 2
+
+    yield COMPARE, mid, lo
+    if array[mid] < array[lo]:
+        yield _swap(array, mid, lo)
+    yield COMPARE, hi, lo
+    if array[hi] < array[lo]:
+        yield _swap(array, hi, lo)
+    yield COMPARE, hi, mid
+    if array[hi] < array[mid]:
+        yield _swap(array, hi, mid)
+
+    return mid
+
+
+def heap_sort(array):
+    n = len(array)
+    for start in range(n // 2 - 1, -1, -1):
+        yield from _sift_down(array, start, n)
+
+    for end in range(n - 1, 0, -1):
+        yield _swap(array, 0, end)
+        yield SORTED, end, end + 1
+        yield from _sift_down(array, 0, end)
+
+    yield SORTED, 0, n
+
+
+def _sift_down(array, root, end):
+    while True:
+        child = 2 * root + 1
+        if child >= end:
+            return
+
+        if child + 1 < end:
+            yield COMPARE, child, child + 1
+            if array[child] < array[child + 1]:
+                child += 1
+
+        yield COMPARE, root, child
+        if array[root] >= array[child]:
+            return
+
+        yield _swap(array, root, child)
+        root = child
+
+
+def select_k(n, k=None):
+    # The k the selection algorithms work to: how many of the smallest
+    # elements they gather at the front. Defaults to a tenth of the array.
+    if k is None:
+        k = n // 10
+    return min(max(k, 1), n)
+
+
+def quickselect(array, k=None):
+    # Introselect: moves the k-th smallest element to array[k - 1], with
+    # smaller-or-equal keys before it and larger-or-equal after. Partitions
+    # like quick_sort but only follows the side holding k - 1; after
+    # 2 log2(n) partitions without finishing it switches to median-of-
+    # medians pivots, which bound the worst case at O(n).
+    n = len(array)
+    k = select_k(n, k)
+    if k:
+        yield from _select(array, 0, n - 1, k - 1, 2 * n.bit_length())
+        yield SORTED, k - 1, k
+    yield PIVOT, -1, 0
+
+
+def _select(array, lo, hi, target, budget):
+    while hi > lo:
+        if budget > 0:
+            budget -= 1
+            pivot = (yield from _median_of_three(array, lo, hi)) if hi - lo >= 2 else lo
+        else:
+            pivot = yield from _median_of_medians(array, lo, hi)
+        if pivot != lo:
+            yield _swap(array, lo, pivot)
+
+        lt, gt = yield from _partition3(array, lo, hi)
+        yield SORTED, lt, gt + 1
+        if target < lt:
+            hi = lt - 1
+        elif target > gt:
+            lo = gt + 1
+        else:
+            return
+
+
+def _median_of_medians(array, lo, hi):
+    # Sorts each group of five, gathers the group medians at the front of
+    # the range and selects their median (with median-of-medians pivots
+    # throughout); at least 3/10 of the range is on either side of it.
+    if hi - lo < 5:
+        yield from _insertion_sort_range(array, lo, lo + 1, hi + 1)
+        return (lo + hi) // 2
+
+    end = lo
+    for start in range(lo, hi + 1, 5):
+        last = min(start + 4, hi)
+        yield from _insertion_sort_range(array, start, start + 1, last + 1)
+        median = (start + last) // 2
+        if median != end:
+            yield _swap(array, end, median)
+        end += 1
+
+    mid = (lo + end - 1) // 2
+    yield from _select(array, lo, end - 1, mid, 0)
+    return mid
+
+
+def partial_heap_sort(array, k=None):
+    # Top-k with a bounded heap: array[:k] is kept as a max-heap of the k
+    # smallest seen so far, and each later element is one comparison with
+    # its root, replacing it only when smaller. That is a single pass over
+    # the rest, so it works the same on a stream (see topk.py). The heap is
+    # then sorted in place: O(n log k) in all.
+    n = len(array)
+    k = select_k(n, k)
+    for start in range(k // 2 - 1, -1, -1):
+        yield from _sift_down(array, start, k)
+
+    for i in range(k, n):
+        yield COMPARE, i, 0
+        if array[i] < array[0]:
+            yield _swap(array, 0, i)
+            yield from _sift_down(array, 0, k)
+
+    for end in range(k - 1, 0, -1):
+        yield _swap(array, 0, end)
+        yield SORTED, end, end + 1
+        yield from _sift_down(array, 0, end)
+
+    yield SORTED, 0, min(k, 1)
+
+
+CIURA_GAPS = [1, 4, 10, 23, 57, 132, 301, 701]
+
+
+def shell_sort(array):
+    n = len(array)
+
+    # Ciura's sequence is empirical and stops at 701; extend it
+    # geometrically (x2.25) for larger arrays.
+    gaps = list(CIURA_GAPS)
+    while gaps[-1] < n:
+        gaps.append(int(gaps[-1] * 2.25))
+
+    for gap in reversed(gaps):
+        if gap >= n:
+            continue
+
+        for i in range(gap, n):
+            value = array[i]
+            j = i
+            yield PIVOT, i, 0
+
+            while j >= gap:
+                yield COMPARE, j - gap, j
+                if array[j - gap] <= value:
+                    break
+
+                array[j] = array[j - gap]
+                yield WRITE, j, array[j]
+                j -= gap
+
+            if j != i:
+                array[j] = value
+                yield WRITE, j, value
+
+    yield PIVOT, -1, 0
+    yield SORTED, 0, n
+
+
+def tim_sort(array):
+    # Insertion + merge hybrid in the style of Timsort: find natural runs
+    # (reversing strictly descending ones), extend short runs to min_run with
+    # insertion sort, and merge runs while keeping their lengths balanced.
+    n = len(array)
+    min_run = _min_run(n)
+    runs = []
+
+    lo = 0
+    while lo < n:
+        hi = lo + 1
+        if hi < n:
+            yield COMPARE, lo, hi
+            descending = array[hi] < array[lo]
+            hi += 1
+
+            while hi < n:
+                yield COMPARE, hi - 1, hi
+                if (array[hi] < array[hi - 1]) != descending:
+                    break
+                hi += 1
+
+            if descending:
+                i, j = lo, hi - 1
+                while i < j:
+                    yield _swap(array, i, j)
+                    i += 1
+                    j -= 1
+
+        end = min(lo + min_run, n)
+        if hi < end:
+            yield from _insertion_sort_range(array, lo, hi, end)
+            hi = end
+
+        runs.append((lo, hi - lo))
+        yield from _merge_collapse(array, runs)
+        lo = hi
+
+    while len(runs) > 1:
+        i = len(runs) - 2
+        if i > 0 and runs[i - 1][1] < runs[i + 1][1]:
+            i -= 1
+        yield from _merge_at(array, runs, i)
+
+    yield SORTED, 0, n
+
+
+def _min_run(n):
+    r = 0
+    while n >= 64:
+        r |= n & 1
+        n >>= 1
+    return n + r
+
+
+def _insertion_sort_range(array, lo, start, hi):
+    # array[lo:start] is already sorted; binary-insert array[start:hi] into
+    # it, so extending a run costs O(log n) comparisons per element.
+    for i in range(start, hi):
+        key = array[i]
+        left, right = lo, i
+        while left < right:
+            mid = (left + right) // 2
+            yield COMPARE, mid, i
+            if key < array[mid]:
+                right = mid
+            else:
+                left = mid + 1
+
+        for j in range(i, left, -1):
+            array[j] = array[j - 1]
+            yield WRITE, j, array[j]
+
+        if left != i:
+            array[left] = key
+            yield WRITE, left, key
+
+
+def _merge_collapse(array, runs):
+    while len(runs) > 1:
+        i = len(runs) - 2
+        if (i > 0 and runs[i - 1][1] <= runs[i][1] + runs[i + 1][1]) or \
+                (i > 1 and runs[i - 2][1] <= runs[i - 1][1] + runs[i][1]):
+            if runs[i - 1][1] < runs[i + 1][1]:
+                i -= 1
+        elif runs[i][1] > runs[i + 1][1]:
+            break
+        yield from _merge_at(array, runs, i)
+
+
+def _merge_at(array, runs, i):
+    lo, left_len = runs[i]
+    mid = lo + left_len
+    hi = mid + runs[i + 1][1]
+
+    # Runs that are already in order relative to each other cost a single
+    # comparison, which is what makes the hybrid O(n) on presorted input.
+    yield COMPARE, mid - 1, mid
+    if array[mid] < array[mid - 1]:
+        yield from _merge(array, lo, mid, hi)
+
+    runs[i] = (lo, hi - lo)
+    del runs[i + 1]
+
+
+def counting_sort(array):
+    # One pass builds a histogram of the keys (the moving pivot marks the
+    # scan); the histogram is then shown as one segment per key, each as
+    # wide as its count, and the keys are written back in order.
+    n = len(array)
+    if n == 0:
+        return
+
+    low = min(array)
+    counts = [0] * (max(array) - low + 1)
+    yield AUX, len(counts), 0
+    for i in range(n):
+        counts[array[i] - low] += 1
+        yield PIVOT, i, 0
+    yield PIVOT, -1, 0
+
+    yield from _show_buckets(0, counts)
+    k = 0
+    for key, count in enumerate(counts, low):
+        for _ in range(count):
+            array[k] = key
+            yield WRITE, k, key
+            k += 1
+
+    yield SEGMENT, 0, 0
+    yield AUX, -len(counts), 0
+    yield SORTED, 0, n
+
+
+def lsd_radix_sort(array, base=10):
+    # Least significant digit first: each pass is a stable counting sort on
+    # one digit, scattered into a buffer and copied back. Keys are taken
+    # relative to the minimum, so negative values work too.
+    n = len(array)
+    if n < 2:
+        yield SORTED, 0, n
+        return
+
+    low = min(array)
+    span = max(array) - low
+    buffer = [0] * n
+    yield AUX, n + base, 0
+
+    place = 1
+    while place <= span:
+        counts = [0] * base
+        for i in range(n):
+            counts[(array[i] - low) // place % base] += 1
+            yield PIVOT, i, 0
+        yield PIVOT, -1, 0
+
+        yield from _show_buckets(0, counts)
+        yield from _scatter(array, buffer, 0, n, low, place, base, counts)
+        place *= base
+
+    yield SEGMENT, 0, 0
+    yield AUX, -(n + base), 0
+    yield SORTED, 0, n
+
+
+def msd_radix_sort(array, base=10):
+    # Most significant digit first: partition by the top digit, then each
+    # bucket by the next digit, and so on. A bucket is done once it has one
+    # element or its keys have no digits left.
+    n = len(array)
+    if n < 2:
+        yield SORTED, 0, n
+        return
+
+    low = min(array)
+    span = max(array) - low
+    place = 1
+    while place * base <= span:
+        place *= base
+
+    buffer = [0] * n
+    yield AUX, n + base, 0
+
+    stack = [(0, n, place)]
+    while stack:
+        lo, hi, place = stack.pop()
+        if hi - lo < 2 or place == 0:
+            yield SORTED, lo, hi
+            continue
+
+        counts = [0] * base
+        for i in range(lo, hi):
+            counts[(array[i] - low) // place % base] += 1
+            yield PIVOT, i, 0
+        yield PIVOT, -1, 0
+
+        yield from _show_buckets(lo, counts)
+        yield from _scatter(array, buffer, lo, hi, low, place, base, counts)
+
+        # Push the buckets so the leftmost is handled next.
+        start = hi
+        for count in reversed(counts):
+            start -= count
+            if count:
+                stack.append((start, start + count, place // base))
+
+    yield SEGMENT, 0, 0
+    yield AUX, -(n + base), 0
+
+
+def bucket_sort(array, buckets=None):
+    # About sqrt(n) buckets over the key range; each element is dropped into
+    # its bucket, the buckets are written back in order and then each one
+    # is finished with binary insertion sort.
+    n = len(array)
+    if n < 2:
+        yield SORTED, 0, n
+        return
+
+    buckets = buckets or max(1, int(n ** 0.5))
+    low = min(array)
+    # Integer keys split [low, high + 1) evenly; other keys split [low,
+    # high], the maximum going to the last bucket.
+    span = max(array) - low
+    width = span + 1 if span == int(span) else span
+    contents = [[] for _ in range(buckets)]
+    yield AUX, n, 0
+    for i in range(n):
+        contents[min(int((array[i] - low) * buckets // width), buckets - 1)].append(array[i])
+        yield PIVOT, i, 0
+    yield PIVOT, -1, 0
+
+    yield from _show_buckets(0, list(map(len, contents)))
+    k = 0
+    for bucket in contents:
+        for value in bucket:
+            array[k] = value
+            yield WRITE, k, value
+            k += 1
+    yield AUX, -n, 0
+
+    lo = 0
+    for bucket in contents:
+        hi = lo + len(bucket)
+        yield from _insertion_sort_range(array, lo, lo + 1, hi)
+        if lo < hi:
+            yield SORTED, lo, hi
+        lo = hi
+
+    yield SEGMENT, 0, 0
+
+
+def _show_buckets(lo, counts):
+    # One segment per non-empty bucket, starting at lo: the histogram laid
+    # out where the buckets will end up.
+    for count in counts:
+        if count:
+            yield SEGMENT, lo, lo + count
+            lo += count
+
+
+def _scatter(array, buffer, lo, hi, low, place, base, counts):
+    # Stable scatter of array[lo:hi] by digit into buffer[lo:hi], then the
+    # copy back that shows the new order.
+    starts = [0] * base
+    start = lo
+    for digit in range(base):
+        starts[digit] = start
+        start += counts[digit]
+
+    for i in range(lo, hi):
+        digit = (array[i] - low) // place % base
+        buffer[starts[digit]] = array[i]
+        starts[digit] += 1
+
+    for k in range(lo, hi):
+        array[k] = buffer[k]
+        yield WRITE, k, buffer[k]
+
+
+def _swap(array, i, j):
+    array[i], array[j] = array[j], array[i]
+    return SWAP, i, j
+
@@ -0,0 +1,193 @@
+import argparse
+import csv
+import inspect
+import json
+import sys
+import time
+from collections import deque
+
+from distributions import DISTRIBUTIONS, PARAM_MIN, generate
+from instrument import Counters
+from registry import ALGORITHMS
+from storage import STORAGES, clone, nbytes, np, resolve_storage
+
+FIELDS = ["algorithm", "distribution", "storage", "n", "seed", "array_bytes", "seconds",
+          "comparisons", "swaps", "writes", "reads", "peak_aux", "ops", "ops_per_sec"]
+
+
+def normalize(name):
+    return name.lower().replace('-', ' ').replace('_', ' ').strip()
+
+
+def lookup(name, table):
+    # Accept "bubble", "bubble-sort" or "Bubble Sort" on the command line.
+    wanted = normalize(name)
+    for key in table:
+        if normalize(key) in (wanted, wanted + " sort"):
+            return key
+    raise argparse.ArgumentTypeError(
+        f"unknown choice {name!r} (choose from {', '.join(table)})")
+
+
+def run_benchmark(algorithm, array, instrument=True, **params):
+    # Without instrumentation the step events are dropped as they come, so
+    # `seconds` is the generator alone; the counter fields are then None.
+    # NumPy arrays are sorted by the algorithm's vectorized version when it
+    # has one, which produces no step events either. Parameters the
+    # algorithm doesn't take (e.g. `base` for Heap Sort) are ignored.
+    original = clone(array)
+    spec = ALGORITHMS.spec(algorithm)
+    vectorized = None
+    if np is not None and isinstance(array, np.ndarray):
+        vectorized = spec.load_vectorized()
+    sort = vectorized or ALGORITHMS[algorithm]
+    accepted = inspect.signature(sort).parameters
+    params = {key: val for key, val in params.items() if key in accepted and val is not None}
+    counters = Counters() if instrument and vectorized is None else None
+
+    start = time.perf_counter_ns()
+    if vectorized is not None:
+        sort(array, **params)
+    elif counters is None:
+        deque(sort(array, **params), maxlen=0)
+    else:
+        counters.consume(sort(array, **params))
+    seconds = (time.perf_counter_ns() - start) / 1e9
+
+    try:
+        spec.verify(array, original, params.get("k"))
+    except RuntimeError as e:
+        raise RuntimeError(f"{algorithm}: {e}")
+
+    result = {
+        "algorithm": algorithm,
+        "n": len(array),
+        "array_bytes": nbytes(array),
+        "seconds": round(seconds, 6),
+    }
+    if counters is None:
+        result.update(dict.fromkeys(Counters.fields + ("ops", "ops_per_sec")))
+        return result
+
+    ops = counters.comparisons + counters.swaps + counters.writes
+    result.update(counters.as_dict())
+    result.update(ops=ops, ops_per_sec=round(ops / seconds) if seconds else 0)
+    return result
+
+
+def parse_sizes(text):
+    try:
+        return [int(float(size)) for size in text.split(',') if size]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"bad size list {text!r}")
+
+
+def at_least(low):
+    def parse(text):
+        try:
+            value = int(text)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"invalid int value: {text!r}")
+        if value < low:
+            raise argparse.ArgumentTypeError(f"must be at least {low} (got {value})")
+        return value
+    return parse
+
+
+def add_distribution_args(parser):
+    parser.add_argument("--swaps", type=at_least(PARAM_MIN["swaps"]),
+                        help="Nearly Sorted: number of random swaps (default: n/50)")
+    parser.add_argument("--teeth", type=at_least(PARAM_MIN["teeth"]),
+                        help="Sawtooth: number of teeth (default: 4)")
+    parser.add_argument("--unique", type=at_least(PARAM_MIN["unique"]),
+                        help="Few Unique: number of distinct keys (default: 5)")
+    parser.add_argument("--exponent", type=float, help="Zipf: skew exponent s (default: 1.2)")
+    parser.add_argument("--run-length", type=at_least(PARAM_MIN["run_length"]),
+                        help="Sorted Runs: run length r (default: 32)")
+
+
+def distribution_params(args):
+    return {"swaps": args.swaps, "teeth": args.teeth, "unique": args.unique,
+            "exponent": args.exponent, "run_length": args.run_length}
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="sorting-visualizer.py bench",
+        description="Run the visualizer's algorithms without a GUI and report "
+                    "time and operation counts.")
+    parser.add_argument("-a", "--algorithms", default="all",
+                        help="comma-separated algorithm names, or 'all' (default)")
+    parser.add_argument("-n", "--sizes", type=parse_sizes, default=[10, 100, 1000],
+                        help="comma-separated array sizes, e.g. 10,1e3,1e5 (default: 10,100,1000)")
+    parser.add_argument("-d", "--distribution", default="Uniform",
+                        type=lambda name: lookup(name, DISTRIBUTIONS),
+                        help=f"input distribution: {', '.join(DISTRIBUTIONS)} (default: Uniform)")
+    add_distribution_args(parser)
+    parser.add_argument("-s", "--seed", type=int, default=0,
+                        help="random seed for the input arrays (default: 0)")
+    parser.add_argument("--storage", choices=STORAGES, default="list",
+                        help="element storage: Python list, array('i'), or an int32 NumPy "
+                             "array (falls back to array('i') without NumPy; default: list). "
+                             "With numpy, the non-comparison sorts run vectorized and "
+                             "report no operation counts")
+    parser.add_argument("--base", type=int,
+                        help="LSD/MSD Radix Sort: digit base (default: 10)")
+    parser.add_argument("-k", type=int,
+                        help="selection algorithms: how many of the smallest elements to "
+                             "select (default: n/10)")
+    parser.add_argument("--no-instrument", dest="instrument", action="store_false",
+                        help="only time the algorithm; skip every operation counter")
+    parser.add_argument("-f", "--format", choices=["json", "csv"], default="json")
+    parser.add_argument("-o", "--output", help="write the report here instead of stdout")
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    if args.algorithms == "all":
+        algorithms = list(ALGORITHMS)
+    else:
+        try:
+            algorithms = [lookup(name, ALGORITHMS) for name in args.algorithms.split(',')]
+        except argparse.ArgumentTypeError as e:
+            parser.error(str(e))
+
+    if args.base is not None and args.base < 2:
+        parser.error("--base must be at least 2")
+    if args.k is not None and args.k < 1:
+        parser.error("-k must be at least 1")
+
+    storage = resolve_storage(args.storage)
+    results = []
+    for n in args.sizes:
+        try:
+            data = generate(args.distribution, n, args.seed, storage, **distribution_params(args))
+        except ValueError as e:
+            parser.error(str(e))
+        for algorithm in algorithms:
+            result = run_benchmark(algorithm, clone(data), args.instrument, base=args.base,
+                                   k=args.k)
+            result.update(distribution=args.distribution, storage=storage, seed=args.seed)
+            results.append({field: result[field] for field in FIELDS})
+            print(f"{algorithm} n={n}: {result['seconds']:.3f}s", file=sys.stderr)
+
+    write_report(results, FIELDS, args.format, args.output)
+    return 0
+
+
+def write_report(results, fields, fmt, output=None):
+    out = open(output, "w", newline="") if output else sys.stdout
+    try:
+        if fmt == "json":
+            json.dump(results, out, indent=2)
+            out.write("\n")
+        else:
+            writer = csv.DictWriter(out, fieldnames=fields)
+            writer.writeheader()
+            writer.writerows(results)
+    finally:
+        if out is not sys.stdout:
+            out.close()
@@ -0,0 +1,209 @@
+import argparse
+import hashlib
+import inspect
+import json
+import math
+import os
+import sys
+import threading
+import time
+from functools import lru_cache
+
+from distributions import DISTRIBUTIONS, generate
+from registry import ALGORITHMS
+
+# Empirical complexity: sweep the array size on a log scale (powers of two)
+# for one algorithm and input distribution, measure each size, and fit
+# y = c * n^k to every metric by least squares on log y = log c + k log n.
+# The sweep stops at MAX_SIZE, or once measuring one size took longer than
+# the budget, so quadratic sorts stop early. Measurements are cached on
+# disk, keyed by algorithm, distribution, size, seed and a hash of the code
+# that produced them, so a repeat sweep reads them back instead.
+MIN_SIZE = 32
+MAX_SIZE = 1 << 14
+BUDGET = 0.5
+# Timing repeats until this much time is spent (or TIMING_RUNS runs), and
+# keeps the fastest run.
+MIN_TIME = 0.05
+TIMING_RUNS = 5
+CACHE_PATH = os.path.join(os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"),
+                          "sorting-visualizer", "complexity.json")
+
+FIELDS = ["algorithm", "distribution", "n", "seed", "comparisons", "swaps", "writes",
+          "stores", "seconds", "wall"]
+# What gets fitted. Element stores are writes + 2 * swaps (see instrument.py).
+METRICS = ["comparisons", "stores", "seconds"]
+
+
+def sizes(max_size=MAX_SIZE):
+    n = MIN_SIZE
+    while n <= max_size:
+        yield n
+        n *= 2
+
+
+@lru_cache(maxsize=None)
+def code_version(algorithm):
+    # Changing the algorithm, the input generators or the counting rules
+    # makes old measurements stale. The sources can't change under a
+    # running process, so each algorithm is hashed once.
+    import algorithms, distributions, instrument
+
+    digest = hashlib.sha1()
+    files = {inspect.getsourcefile(module) for module in (algorithms, distributions, instrument)}
+    files.add(inspect.getsourcefile(ALGORITHMS[algorithm]))
+    for path in sorted(files):
+        with open(path, "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:12]
+
+
+class ProfileCache:
+    # Measurements by key, loaded from and saved to one JSON file. The GUI
+    # reads it while a sweep writes it from another thread, hence the lock.
+
+    def __init__(self, path=CACHE_PATH):
+        self.path = path
+        self.lock = threading.Lock()
+        self.entries = {}
+        if path is None:
+            return
+        try:
+            with open(path) as f:
+                self.entries = json.load(f)
+        except (OSError, ValueError):
+            pass
+
+    def get(self, key):
+        with self.lock:
+            return self.entries.get(key)
+
+    def put(self, key, row):
+        with self.lock:
+            self.entries[key] = row
+            if self.path is None:
+                return
+            # Written to a temp file first so a crash never leaves half a cache.
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            temp = f"{self.path}.{os.getpid()}.tmp"
+            with open(temp, "w") as f:
+                json.dump(self.entries, f)
+            os.replace(temp, self.path)
+
+
+def measure(algorithm, distribution, n, seed=0):
+    from bench import run_benchmark
+
+    start = time.perf_counter()
+    array = generate(distribution, n, seed)
+    row = run_benchmark(algorithm, list(array))
+    seconds = []
+    while len(seconds) < TIMING_RUNS and sum(seconds) < MIN_TIME:
+        seconds.append(run_benchmark(algorithm, list(array), instrument=False)["seconds"])
+    return {"algorithm": algorithm, "distribution": distribution, "n": n, "seed": seed,
+            "comparisons": row["comparisons"], "swaps": row["swaps"], "writes": row["writes"],
+            "stores": row["writes"] + 2 * row["swaps"], "seconds": min(seconds),
+            "wall": round(time.perf_counter() - start, 6)}
+
+
+def sweep(algorithm, distribution, seed=0, cache=None, max_size=MAX_SIZE, budget=BUDGET,
+          run=True, progress=None, stop=None):
+    # Returns the rows measured (or read from the cache) in size order. With
+    # run=False nothing is measured: the result is None unless the whole
+    # sweep is already cached.
+    version = code_version(algorithm)
+    rows = []
+    for n in sizes(max_size):
+        if stop is not None and stop.is_set():
+            break
+        key = f"{algorithm}|{distribution}|{n}|{seed}|{version}"
+        row = cache.get(key) if cache is not None else None
+        if row is None:
+            if not run:
+                return None
+            try:
+                row = measure(algorithm, distribution, n, seed)
+            except ValueError:
+                break  # e.g. Quicksort Killer past its size limit
+            if cache is not None:
+                cache.put(key, row)
+        rows.append(row)
+        if progress is not None:
+            progress(row)
+        if row["wall"] > budget:
+            break
+    return rows
+
+
+def fit(rows, metric):
+    # (k, c, r²) of metric ≈ c * n^k, or None without two positive points.
+    points = [(math.log(row["n"]), math.log(row[metric])) for row in rows if row[metric] > 0]
+    if len(points) < 2:
+        return None
+    mean_x = sum(x for x, _ in points) / len(points)
+    mean_y = sum(y for _, y in points) / len(points)
+    sxx = sum((x - mean_x) ** 2 for x, _ in points)
+    sxy = sum((x - mean_x) * (y - mean_y) for x, y in points)
+    k = sxy / sxx
+    c = math.exp(mean_y - k * mean_x)
+    residual = sum((y - mean_y - k * (x - mean_x)) ** 2 for x, y in points)
+    total = sum((y - mean_y) ** 2 for _, y in points)
+    return k, c, 1 - residual / total if total else 1.0
+
+
+def fits(rows):
+    return {metric: fit(rows, metric) for metric in METRICS}
+
+
+def describe(fitted):
+    if fitted is None:
+        return "–"
+    k, c, _ = fitted
+    return f"{c:.3g}·n^{k:.2f}"
+
+
+def main(argv=None):
+    from bench import lookup, write_report
+
+    parser = argparse.ArgumentParser(
+        prog="sorting-visualizer.py complexity",
+        description="Measure how an algorithm's comparisons, element stores and time grow "
+                    "with n, and fit c * n^k to each by log-log regression.")
+    parser.add_argument("-a", "--algorithms", default="all",
+                        help="comma-separated algorithm names, or 'all' (default)")
+    parser.add_argument("-d", "--distribution", default="Uniform",
+                        type=lambda name: lookup(name, DISTRIBUTIONS),
+                        help=f"input distribution: {', '.join(DISTRIBUTIONS)} (default: Uniform)")
+    parser.add_argument("-s", "--seed", type=int, default=0)
+    parser.add_argument("--max-size", type=int, default=MAX_SIZE,
+                        help=f"largest n in the sweep (default: {MAX_SIZE:,})")
+    parser.add_argument("--budget", type=float, default=BUDGET,
+                        help=f"stop after a size that took longer than this many seconds "
+                             f"(default: {BUDGET})")
+    parser.add_argument("--cache", default=CACHE_PATH,
+                        help=f"measurement cache (default: {CACHE_PATH})")
+    parser.add_argument("--no-cache", dest="cache", action="store_const", const=None,
+                        help="measure everything again and save nothing")
+    parser.add_argument("-f", "--format", choices=["json", "csv"], default="json")
+    parser.add_argument("-o", "--output", help="write the measurements here instead of stdout")
+    args = parser.parse_args(argv)
+
+    if args.algorithms == "all":
+        algorithms = list(ALGORITHMS)
+    else:
+        try:
+            algorithms = [lookup(name, ALGORITHMS) for name in args.algorithms.split(',')]
+        except argparse.ArgumentTypeError as e:
+            parser.error(str(e))
+
+    cache = ProfileCache(args.cache)
+    results = []
+    for algorithm in algorithms:
+        rows = sweep(algorithm, args.distribution, args.seed, cache, args.max_size, args.budget)
+        results.extend(rows)
+        fitted = fits(rows)
+        print(f"{algorithm}: " + ", ".join(f"{metric} {describe(fitted[metric])}"
+                                            for metric in METRICS), file=sys.stderr)
+
+    write_report(results, FIELDS, args.format, args.output)
+    return 0
@@ -0,0 +1,203 @@
+import inspect
+import random
+from functools import lru_cache
+from itertools import accumulate
+
+from storage import make_array, np, resolve_storage
+
+LOW = 10
+HIGH = 500
+KILLER_MAX = 20_000
+
+
+def uniform(n, rng, low=LOW, high=HIGH):
+    return [rng.randint(low, high) for _ in range(n)]
+
+
+def ascending(n, rng, low=LOW, high=HIGH):
+    return sorted(uniform(n, rng, low, high))
+
+
+def descending(n, rng, low=LOW, high=HIGH):
+    return sorted(uniform(n, rng, low, high), reverse=True)
+
+
+def nearly_sorted(n, rng, low=LOW, high=HIGH, swaps=None):
+    # Sorted, then `swaps` random pairs exchanged (default: 2% of n).
+    values = ascending(n, rng, low, high)
+    if swaps is None:
+        swaps = max(1, n // 50)
+    for _ in range(swaps if n > 1 else 0):
+        i, j = rng.randrange(n), rng.randrange(n)
+        values[i], values[j] = values[j], values[i]
+    return values
+
+
+def sawtooth(n, rng, low=LOW, high=HIGH, teeth=4):
+    tooth = max(1, -(-n // teeth))
+    return [low + (i % tooth) * (high - low) // max(1, tooth - 1) for i in range(n)]
+
+
+def organ_pipe(n, rng, low=LOW, high=HIGH):
+    half = (n + 1) // 2
+    rising = [low + i * (high - low) // max(1, half - 1) for i in range(half)]
+    return rising + rising[n - half - 1::-1] if n - half else rising
+
+
+def few_unique(n, rng, low=LOW, high=HIGH, unique=5):
+    keys = rng.sample(range(low, high + 1), min(unique, high - low + 1))
+    return [rng.choice(keys) for _ in range(n)]
+
+
+def zipf(n, rng, low=LOW, high=HIGH, exponent=1.2):
+    # Value low + k - 1 is drawn with probability proportional to 1 / k^s,
+    # so a handful of small values dominate.
+    ranks = range(1, high - low + 2)
+    cum_weights = list(accumulate(1 / k ** exponent for k in ranks))
+    return [low + k - 1 for k in rng.choices(ranks, cum_weights=cum_weights, k=n)]
+
+
+def sorted_runs(n, rng, low=LOW, high=HIGH, run_length=32):
+    values = uniform(n, rng, low, high)
+    for start in range(0, n, run_length):
+        values[start:start + run_length] = sorted(values[start:start + run_length])
+    return values
+
+
+def quicksort_killer(n, rng, low=LOW, high=HIGH):
+    # McIlroy's "antiqsort" adversary, played against this repo's own
+    # quick_sort so it stays a killer whatever the pivot rule is. Every
+    # element starts as "gas" (bigger than anything solid); when the sort
+    # compares two gas elements one of them is frozen to the next smallest
+    # value, preferring the current pivot candidate. The frozen values, read
+    # back in input order, drive quick_sort to its O(n^2) worst case.
+    # Building the input costs one such O(n^2) run, hence KILLER_MAX; it
+    # only depends on n, so recent sizes are kept. Values are distinct and
+    # start at `low`; `high` is not enforced.
+    if n > KILLER_MAX:
+        raise ValueError(f"Quicksort Killer needs n <= {KILLER_MAX:,} (got {n:,})")
+    return [low + v for v in _killer_order(n)]
+
+
+@lru_cache(maxsize=8)
+def _killer_order(n):
+    from algorithms import quick_sort
+
+    gas = n
+    value = [gas] * n
+    state = {'solid': 0, 'candidate': -1}
+
+    def freeze(i):
+        value[i] = state['solid']
+        state['solid'] += 1
+
+    def compare(x, y):
+        if value[x] == gas and value[y] == gas:
+            freeze(x if x == state['candidate'] else y)
+        if value[x] == gas:
+            state['candidate'] = x
+        elif value[y] == gas:
+            state['candidate'] = y
+        return value[x] - value[y]
+
+    class Element:
+        __slots__ = ('i',)
+        __hash__ = None
+
+        def __init__(self, i):
+            self.i = i
+
+        def __lt__(self, other):
+            return compare(self.i, other.i) < 0
+
+        def __gt__(self, other):
+            return compare(self.i, other.i) > 0
+
+        def __le__(self, other):
+            return compare(self.i, other.i) <= 0
+
+        def __ge__(self, other):
+            return compare(self.i, other.i) >= 0
+
+        def __eq__(self, other):
+            return compare(self.i, other.i) == 0
+
+    for _ in quick_sort([Element(i) for i in range(n)]):
+        pass
+
+    for i in range(n):
+        if value[i] == gas:
+            freeze(i)
+    return tuple(value)
+
+
+DISTRIBUTIONS = {
+    "Uniform": uniform,
+    "Sorted": ascending,
+    "Reversed": descending,
+    "Nearly Sorted": nearly_sorted,
+    "Sawtooth": sawtooth,
+    "Organ Pipe": organ_pipe,
+    "Few Unique": few_unique,
+    "Zipf": zipf,
+    "Sorted Runs": sorted_runs,
+    "Quicksort Killer": quicksort_killer,
+}
+
+
+def uniform_np(n, rng, low=LOW, high=HIGH):
+    return rng.integers(low, high + 1, n, dtype=np.int32)
+
+
+def ascending_np(n, rng, low=LOW, high=HIGH):
+    return np.sort(uniform_np(n, rng, low, high))
+
+
+def descending_np(n, rng, low=LOW, high=HIGH):
+    return ascending_np(n, rng, low, high)[::-1].copy()
+
+
+def few_unique_np(n, rng, low=LOW, high=HIGH, unique=5):
+    keys = rng.choice(np.arange(low, high + 1, dtype=np.int32),
+                      min(unique, high - low + 1), replace=False)
+    return rng.choice(keys, n)
+
+
+def zipf_np(n, rng, low=LOW, high=HIGH, exponent=1.2):
+    weights = 1 / np.arange(1, high - low + 2) ** exponent
+    return rng.choice(np.arange(low, high + 1, dtype=np.int32), n, p=weights / weights.sum())
+
+
+# NumPy versions of the generators, used for "numpy" storage. They draw from
+# NumPy's own generator, so a seed gives a different (but equally
+# reproducible) array than the pure-Python version.
+VECTORIZED = {
+    "Uniform": uniform_np,
+    "Sorted": ascending_np,
+    "Reversed": descending_np,
+    "Few Unique": few_unique_np,
+    "Zipf": zipf_np,
+}
+
+
+# Smallest value each knob accepts.
+PARAM_MIN = {"swaps": 0, "teeth": 1, "unique": 1, "run_length": 1}
+
+
+def generate(distribution, n, seed=None, storage="list", **params):
+    # Parameters a generator doesn't take (e.g. `swaps` for Uniform) are
+    # ignored, so callers can pass every knob they have.
+    for key, low in PARAM_MIN.items():
+        if params.get(key) is not None and params[key] < low:
+            raise ValueError(f"{key} must be at least {low} (got {params[key]})")
+    storage = resolve_storage(storage)
+    if storage == "numpy" and distribution in VECTORIZED:
+        generator = VECTORIZED[distribution]
+        rng = np.random.default_rng(seed)
+    else:
+        generator = DISTRIBUTIONS[distribution]
+        rng = random.Random(seed)
+
+    accepted = inspect.signature(generator).parameters
+    params = {key: val for key, val in params.items() if key in accepted and val is not None}
+    return make_array(generator(n, rng, **params), storage)
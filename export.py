@@ -0,0 +1,381 @@
+import argparse
+import shutil
+import subprocess
+import sys
+from itertools import islice
+
+from distributions import DISTRIBUTIONS, generate
+from playback import SortState
+from registry import ALGORITHMS
+from storage import np
+from theme import COLORS, PADDING, bar_geometry, column_count, lighten, uses_columns
+
+# GIF delays are in 1/100 s and most viewers slow down anything under 2/100,
+# so clips default to a frame rate that divides evenly.
+DEFAULT_FPS = 25
+
+
+class Palette:
+    # Every colour the canvas can show, plus the lighter cap of each bar
+    # colour. Frames are arrays of indices into this palette.
+
+    def __init__(self):
+        base = [COLORS['canvas'], COLORS['bar'], COLORS['compare'], COLORS['swap'],
+                COLORS['sorted'], COLORS['pivot'], *COLORS['segments']]
+        self.colors = base + [lighten(color) for color in base]
+        self.index = {}
+        for k, color in enumerate(base):
+            self.index.setdefault(color, k)
+        self.light = np.arange(len(base), dtype=np.uint8) + len(base)
+        self.segments = np.array([self.index[color] for color in COLORS['segments']], dtype=np.uint8)
+        self.rgb = np.array([[int(color[i:i+2], 16) for i in (1, 3, 5)] for color in self.colors],
+                            dtype=np.uint8)
+
+
+class FrameRasterizer:
+    # Draws a SortState into a (height, width) NumPy image of palette
+    # indices, with the same bar geometry, colour rules and bar/column switch
+    # as the Tk renderers. Everything is computed per pixel column and then
+    # broadcast down the rows, so a frame costs a few array passes.
+
+    def __init__(self, width, height, palette):
+        self.width = width
+        self.height = height
+        self.palette = palette
+        self.rows = np.arange(height)[:, None]
+        self.x = np.arange(width) + 0.5
+
+    def draw(self, state, color_positions=None):
+        color_positions = color_positions or {}
+        frame = np.zeros((self.height, self.width), dtype=np.uint8)
+        n = len(state.array)
+        if not n:
+            return frame
+
+        values = np.asarray(state.array)
+        colors = self.element_colors(state, color_positions, n)
+        max_val = max(int(values.max()), 1)
+        if uses_columns(n, self.width):
+            top, bottom, color, valid = self.columns(values, colors, state, color_positions, max_val)
+            cap = top
+        else:
+            top, bottom, color, valid, cap = self.bars(values, colors, max_val)
+
+        inside = valid & (self.rows >= top) & (self.rows < bottom)
+        body = np.where(self.rows < cap, self.palette.light[color], color)
+        frame[inside] = np.broadcast_to(body, frame.shape)[inside]
+        return frame
+
+    def element_colors(self, state, color_positions, n):
+        # Highlight > sorted > segment > plain, as in Renderer.color_of.
+        palette = self.palette
+        colors = np.full(n, palette.index[COLORS['bar']], dtype=np.uint8)
+        segments = np.frombuffer(bytes(state.segment_mask), dtype=np.uint8)
+        tagged = segments > 0
+        colors[tagged] = palette.segments[(segments[tagged] - 1) % len(palette.segments)]
+        colors[np.frombuffer(bytes(state.sorted_mask), dtype=bool)] = palette.index[COLORS['sorted']]
+        for i, color in color_positions.items():
+            if 0 <= i < n:
+                colors[i] = palette.index[color]
+        return colors
+
+    def bars(self, values, colors, max_val):
+        n = len(values)
+        bar_width, base, scale = bar_geometry(n, self.width, self.height, max_val)
+        bar = np.floor((self.x - PADDING) / bar_width).astype(np.int64)
+        valid = (bar >= 0) & (bar < n)
+        bar = np.clip(bar, 0, n - 1)
+        # Tk's rectangle stops 2px short of the next bar.
+        valid &= self.x < PADDING + bar * bar_width + bar_width - 2
+
+        heights = values[bar] * scale
+        top = base - heights
+        cap = top + np.minimum(5, heights * 0.1)
+        return top, base, colors[bar], valid, cap
+
+    def columns(self, values, colors, state, color_positions, max_val):
+        # Column c holds the indices i with i * columns // n == c, drawn as a
+        # line from its smallest to its largest value.
+        n = len(values)
+        columns = column_count(n, self.width)
+        column_width = (self.width - 2 * PADDING) / columns
+        _, base, scale = bar_geometry(n, self.width, self.height, max_val)
+        starts = -(-np.arange(columns) * n // columns)
+        low = np.minimum.reduceat(values, starts)
+        high = np.maximum.reduceat(values, starts)
+
+        palette = self.palette
+        color = colors[starts]
+        done = np.minimum.reduceat(np.frombuffer(bytes(state.sorted_mask), dtype=np.uint8), starts)
+        color[done == 1] = palette.index[COLORS['sorted']]
+        for i, highlight in color_positions.items():
+            if 0 <= i < n:
+                color[i * columns // n] = palette.index[highlight]
+
+        column = np.floor((self.x - PADDING) / column_width).astype(np.int64)
+        valid = (column >= 0) & (column < columns)
+        column = np.clip(column, 0, columns - 1)
+        top = base - high[column] * scale - 1
+        bottom = base - low[column] * scale + 1
+        return top, bottom, color[column], valid
+
+
+class GifWriter:
+    # Streaming GIF89a encoder: each frame goes to disk as it arrives, as the
+    # bounding box of the pixels that changed since the previous frame, and
+    # a frame identical to the previous one only lengthens its delay. Only
+    # the last frame is kept in memory.
+    MAX_CODE = 4095
+
+    def __init__(self, path, width, height, fps, palette):
+        self.out = open(path, "wb")
+        self.fps = fps
+        self.previous = None
+        self.pending = None
+        self.frames = 0
+        self.code_size = max(2, (len(palette.rgb) - 1).bit_length())
+
+        table = np.zeros((2 ** self.code_size, 3), dtype=np.uint8)
+        table[:len(palette.rgb)] = palette.rgb
+        self.out.write(b"GIF89a")
+        self.out.write(width.to_bytes(2, "little") + height.to_bytes(2, "little"))
+        self.out.write(bytes([0xF0 | (self.code_size - 1), 0, 0]))
+        self.out.write(table.tobytes())
+        # Loop forever.
+        self.out.write(b"\x21\xFF\x0BNETSCAPE2.0\x03\x01\x00\x00\x00")
+
+    def write(self, frame):
+        if self.previous is not None and np.array_equal(frame, self.previous):
+            self.frames += 1
+            return
+
+        self.flush()
+        if self.previous is None:
+            box = (0, 0, frame.shape[0], frame.shape[1])
+        else:
+            changed = frame != self.previous
+            rows = np.flatnonzero(changed.any(axis=1))
+            cols = np.flatnonzero(changed.any(axis=0))
+            box = (rows[0], cols[0], rows[-1] + 1, cols[-1] + 1)
+        self.pending = (self.frames, box, frame)
+        self.previous = frame
+        self.frames += 1
+
+    def flush(self):
+        if self.pending is None:
+            return
+        start, (top, left, bottom, right), frame = self.pending
+        self.pending = None
+
+        # Round on the clip's clock, not per frame, so delays don't drift.
+        delay = round(self.frames * 100 / self.fps) - round(start * 100 / self.fps)
+        self.out.write(b"\x21\xF9\x04\x04" + max(2, delay).to_bytes(2, "little") + b"\x00\x00")
+        self.out.write(b"\x2C" + b"".join(int(v).to_bytes(2, "little") for v in
+                                          (left, top, right - left, bottom - top)) + b"\x00")
+        self.out.write(bytes([self.code_size]))
+        data = self.pack(*self.lzw(frame[top:bottom, left:right].tobytes()))
+        for k in range(0, len(data), 255):
+            chunk = data[k:k + 255]
+            self.out.write(bytes([len(chunk)]) + chunk)
+        self.out.write(b"\x00")
+
+    def lzw(self, pixels):
+        # Variable-width LZW as GIF specifies it; returns the codes and the
+        # bit width each one is written with. Frames are mostly long runs of
+        # background and bar colour, which is what LZW is good at.
+        clear = 1 << self.code_size
+        end = clear + 1
+        width = self.code_size + 1
+        next_code = end + 1
+        table = {}
+        codes = [clear]
+        widths = [width]
+
+        prefix = pixels[0]
+        for pixel in pixels[1:]:
+            key = prefix << 8 | pixel
+            code = table.get(key)
+            if code is not None:
+                prefix = code
+                continue
+
+            codes.append(prefix)
+            widths.append(width)
+            if next_code <= self.MAX_CODE:
+                table[key] = next_code
+                next_code += 1
+                if next_code > 1 << width and width < 12:
+                    width += 1
+            else:
+                codes.append(clear)
+                widths.append(width)
+                table = {}
+                next_code = end + 1
+                width = self.code_size + 1
+            prefix = pixel
+
+        codes += [prefix, end]
+        widths += [width, width]
+        return codes, widths
+
+    def pack(self, codes, widths):
+        # GIF packs codes least significant bit first.
+        out = bytearray()
+        bits = 0
+        count = 0
+        for code, width in zip(codes, widths):
+            bits |= code << count
+            count += width
+            while count >= 8:
+                out.append(bits & 0xFF)
+                bits >>= 8
+                count -= 8
+        if count:
+            out.append(bits & 0xFF)
+        return bytes(out)
+
+    def close(self):
+        self.flush()
+        self.out.write(b"\x3B")
+        self.out.close()
+
+
+class FfmpegWriter:
+    # Pipes raw RGB frames to ffmpeg, which picks the encoder from the file
+    # extension (e.g. H.264 for .mp4).
+
+    def __init__(self, path, width, height, fps, palette):
+        ffmpeg = shutil.which("ffmpeg")
+        if ffmpeg is None:
+            raise RuntimeError("ffmpeg is not on PATH; install it or export a .gif")
+        self.palette = palette
+        self.process = subprocess.Popen(
+            [ffmpeg, "-y", "-loglevel", "error",
+             "-f", "rawvideo", "-pix_fmt", "rgb24", "-s", f"{width}x{height}", "-r", str(fps),
+             "-i", "-", "-pix_fmt", "yuv420p", path],
+            stdin=subprocess.PIPE)
+
+    def write(self, frame):
+        self.process.stdin.write(self.palette.rgb[frame].tobytes())
+
+    def close(self):
+        self.process.stdin.close()
+        if self.process.wait():
+            raise RuntimeError(f"ffmpeg exited with status {self.process.returncode}")
+
+
+def open_writer(path, width, height, fps, palette):
+    writer = GifWriter if path.lower().endswith(".gif") else FfmpegWriter
+    return writer(path, width, height, fps, palette)
+
+
+def export_clip(algorithm, array, path, width=960, height=540, fps=DEFAULT_FPS,
+                duration=10.0, hold=1.0):
+    # Replays the sort at a fixed number of steps per frame so the clip lasts
+    # about `duration` seconds: long sorts merge many steps into one frame,
+    # short ones show each step for several. A dry run counts the steps
+    # first. The clip ends on `hold` seconds of the sorted array.
+    spec = ALGORITHMS.spec(algorithm)
+    total = sum(1 for _ in ALGORITHMS[algorithm](list(array)))
+    frames = max(1, round(fps * duration))
+    per_frame = total / frames
+
+    palette = Palette()
+    raster = FrameRasterizer(width, height, palette)
+    state = SortState(array)
+    steps = ALGORITHMS[algorithm](list(array))
+    writer = open_writer(path, width, height, fps, palette)
+    try:
+        budget = 0.0
+        highlights = {}
+        for _ in range(frames):
+            budget += per_frame
+            batch = list(islice(steps, int(budget)))
+            budget -= len(batch)
+            if batch:
+                highlights = state.apply_all(batch, set())
+            writer.write(raster.draw(state, state.frame_colors(highlights)))
+
+        state.apply_all(list(steps), set())
+        # A selection algorithm only finishes its k smallest, with the k-th
+        # of a selection held in the pivot colour.
+        k = spec.selected(len(state.array))
+        state.pivot = k - 1 if spec.partial == "select" and k else -1
+        state.clear_masks()
+        state.sorted_mask[:k] = b'\x01' * k
+        final = raster.draw(state, state.frame_colors({}))
+        for _ in range(max(1, round(fps * hold))):
+            writer.write(final)
+    finally:
+        writer.close()
+
+    try:
+        spec.verify(state.array, state.original)
+    except RuntimeError as e:
+        raise RuntimeError(f"{algorithm}: {e}")
+    return frames
+
+
+def slug(name):
+    return name.lower().replace(' ', '-')
+
+
+def main(argv=None):
+    from bench import add_distribution_args, distribution_params, lookup, normalize
+
+    parser = argparse.ArgumentParser(
+        prog="sorting-visualizer.py export",
+        description="Render sorts to GIF or video without a window. Frames are "
+                    "streamed to the encoder one at a time.")
+    parser.add_argument("-a", "--algorithms", default="Quick Sort",
+                        help="comma-separated algorithm names, or 'all' (default: Quick Sort)")
+    parser.add_argument("-d", "--distributions", default="Uniform",
+                        help="comma-separated input distributions, or 'all' (default: Uniform)")
+    parser.add_argument("-n", "--size", type=lambda text: int(float(text)), default=100)
+    parser.add_argument("-s", "--seed", type=int, default=0)
+    add_distribution_args(parser)
+    parser.add_argument("--width", type=int, default=960)
+    parser.add_argument("--height", type=int, default=540)
+    parser.add_argument("--fps", type=int, default=DEFAULT_FPS)
+    parser.add_argument("--duration", type=float, default=10.0,
+                        help="target clip length in seconds, before the final hold (default: 10)")
+    parser.add_argument("--hold", type=float, default=1.0,
+                        help="seconds to show the sorted array at the end (default: 1)")
+    parser.add_argument("-o", "--output", default="{algorithm}-{distribution}-{n}.gif",
+                        help="output path; {algorithm}, {distribution} and {n} are filled in, "
+                             "and the extension picks the format (.gif built in, anything "
+                             "else through ffmpeg; default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    if np is None:
+        parser.error("export needs NumPy (pip install numpy)")
+    if args.width < 2 * PADDING + 2 or args.height < 2 * PADDING + 22 or args.fps < 1:
+        parser.error("frame too small or fps < 1")
+    # yuv420p video needs even dimensions.
+    width, height = args.width & ~1, args.height & ~1
+
+    def choices(text, table):
+        if normalize(text) == "all":
+            return list(table)
+        try:
+            return [lookup(name, table) for name in text.split(',')]
+        except argparse.ArgumentTypeError as e:
+            parser.error(str(e))
+
+    for distribution in choices(args.distributions, DISTRIBUTIONS):
+        try:
+            data = generate(distribution, args.size, args.seed, "list", **distribution_params(args))
+        except ValueError as e:
+            parser.error(str(e))
+        for algorithm in choices(args.algorithms, ALGORITHMS):
+            path = args.output.format(algorithm=slug(algorithm), distribution=slug(distribution),
+                                      n=args.size)
+            try:
+                frames = export_clip(algorithm, data, path, width, height, args.fps,
+                                     args.duration, args.hold)
+            except (OSError, RuntimeError) as e:
+                print(f"Error: {e}", file=sys.stderr)
+                return 1
+            print(f"{path}: {algorithm}, {distribution}, n={args.size}, {frames} frames",
+                  file=sys.stderr)
+    return 0
@@ -0,0 +1,342 @@
+import argparse
+import heapq
+import mmap
+import os
+import shutil
+import sys
+import tempfile
+import time
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+
+from algorithms import WRITE, SORTED, SEGMENT, AUX
+from scheduler import as_ready
+from storage import np
+
+# External merge sort for binary files of native-endian int32 or int64 that
+# don't fit in memory. Pass 1 reads the input through mmap one run at a time,
+# sorts each run in memory (in worker processes if asked) and spills it to a
+# temp file; every later pass k-way merges up to `fan_in` runs with buffered
+# sequential reads and writes, until one run is left.
+DTYPES = {"int32": "i", "int64": "q"}
+MEMORY = 64 << 20
+FAN_IN = 64
+BUFFER_MAX = 1 << 20
+# Sorting a run as Python ints costs about this much per element (pointer,
+# int object and the sorted() copy); with NumPy it's twice the element size.
+PYTHON_INT_BYTES = 48
+# Slots in the downsampled view the GUI shows.
+VIEW_SIZE = 1000
+# With poll=True a merge hands control back (yields None) this often, in
+# merged elements, since its view steps can be millions of elements apart.
+POLL_ELEMENTS = 1 << 15
+
+
+class ExternalStats:
+    fields = ("n", "runs", "passes", "bytes_read", "bytes_written")
+
+    def __init__(self):
+        self.n = 0
+        self.runs = 0
+        self.passes = 0
+        self.bytes_read = 0
+        self.bytes_written = 0
+
+    def as_dict(self):
+        return {field: getattr(self, field) for field in self.fields}
+
+
+def element_count(path, dtype):
+    itemsize = array(DTYPES[dtype]).itemsize
+    size = os.path.getsize(path)
+    if size % itemsize:
+        raise ValueError(f"{path}: size {size:,} is not a multiple of {itemsize} bytes ({dtype})")
+    return size // itemsize
+
+
+def run_length(memory, dtype, workers=1):
+    itemsize = array(DTYPES[dtype]).itemsize
+    per_element = 2 * itemsize if np is not None else PYTHON_INT_BYTES
+    return max(1, memory // max(1, workers) // per_element)
+
+
+def slots(lo, hi, n, view):
+    # The view slots whose element falls in [lo, hi): slot s shows element
+    # s * n // view.
+    return -(-lo * view // n), -(-hi * view // n)
+
+
+def sample_file(path, dtype, view=VIEW_SIZE):
+    # The input as the view shows it, read straight from the mapping.
+    n = element_count(path, dtype)
+    view = min(view, n)
+    if not n:
+        return []
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        with memoryview(mm) as raw, raw.cast(DTYPES[dtype]) as values:
+            return [values[s * n // view] for s in range(view)]
+
+
+def value_range(path, dtype):
+    # The smallest and largest value in the file, so a view can be scaled
+    # for values its samples don't include.
+    if not element_count(path, dtype):
+        return None
+    typecode = DTYPES[dtype]
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        if np is not None:
+            values = np.frombuffer(mm, dtype=typecode)
+            low, high = int(values.min()), int(values.max())
+            del values  # see _sort_run
+            return low, high
+        with memoryview(mm) as raw, raw.cast(typecode) as values:
+            return min(values), max(values)
+
+
+def _sort_run(path, dtype, lo, hi, out_path, picks):
+    # Sorts elements [lo, hi) of the input into out_path. Returns the values
+    # at the given (sorted) positions for the view.
+    typecode = DTYPES[dtype]
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        itemsize = array(typecode).itemsize
+        if np is not None:
+            mapped = np.frombuffer(mm, dtype=typecode, count=hi - lo, offset=lo * itemsize)
+            run = mapped.copy()
+            del mapped  # the mapping can't be closed while NumPy still points into it
+            run.sort()
+            run.tofile(out_path)
+            return [int(run[k]) for k in picks]
+
+        with memoryview(mm)[lo * itemsize:hi * itemsize] as raw, raw.cast(typecode) as chunk:
+            run = array(typecode, sorted(chunk))
+    with open(out_path, "wb") as out:
+        run.tofile(out)
+    return [run[k] for k in picks]
+
+
+def _read_run(path, typecode, buffer_bytes, stats):
+    with open(path, "rb") as f:
+        while True:
+            block = f.read(buffer_bytes)
+            if not block:
+                return
+            stats.bytes_read += len(block)
+            values = array(typecode)
+            values.frombytes(block)
+            yield from values
+
+
+def external_sort_steps(path, output, dtype="int32", memory=MEMORY, workers=1, fan_in=FAN_IN,
+                        tmpdir=None, view=0, stats=None, poll=False):
+    # Sorts `path` into `output`. Step events describe a downsampled view of
+    # the file with `view` slots (see sample_file): each run is a SEGMENT
+    # written with its sorted samples, then every merge rewrites the slots
+    # of its output range. With view=0 nothing is yielded. With poll=True it
+    # yields None while waiting on the worker pool (see scheduler.py).
+    stats = stats or ExternalStats()
+    typecode = DTYPES[dtype]
+    itemsize = array(typecode).itemsize
+    n = stats.n = element_count(path, dtype)
+    view = min(view, n)
+    if fan_in < 2:
+        raise ValueError("fan-in must be at least 2")
+    if os.path.abspath(output) == os.path.abspath(path):
+        raise ValueError("output must be a different file from the input")
+
+    length = run_length(memory, dtype, workers)
+    bounds = [(lo, min(lo + length, n)) for lo in range(0, n, length)]
+    stats.runs = len(bounds)
+    if not bounds:
+        open(output, "wb").close()
+        return
+
+    workdir = tempfile.mkdtemp(prefix="external-sort-", dir=tmpdir)
+    try:
+        # Pass 1: run formation. A single run goes straight to the output.
+        if view:
+            yield SEGMENT, 0, 0
+        runs = []
+        jobs = []
+        for k, (lo, hi) in enumerate(bounds):
+            out_path = output if len(bounds) == 1 else os.path.join(workdir, f"run-{k}")
+            first, last = slots(lo, hi, n, view)
+            picks = [s * n // view - lo for s in range(first, last)]
+            jobs.append((path, dtype, lo, hi, out_path, picks))
+
+        in_memory = length * min(workers, len(jobs))
+        yield AUX, in_memory, 0
+        # Polling callers get a pool even for one worker: sorting a run
+        # in-process would block them.
+        use_pool = poll or (workers > 1 and len(jobs) > 1)
+        pool = ProcessPoolExecutor(max_workers=workers) if use_pool else None
+        try:
+            if pool is None:
+                done = ((job, _sort_run(*job)) for job in jobs)
+            else:
+                futures = {pool.submit(_sort_run, *job): job for job in jobs}
+                done = (None if future is None else (futures[future], future.result())
+                        for future in as_ready(futures, poll))
+
+            for item in done:
+                if item is None:
+                    yield None
+                    continue
+                (_, _, lo, hi, out_path, _), samples = item
+                stats.bytes_read += (hi - lo) * itemsize
+                stats.bytes_written += (hi - lo) * itemsize
+                runs.append((lo, hi, out_path))
+                if view:
+                    first, last = slots(lo, hi, n, view)
+                    yield SEGMENT, first, last
+                    for s, value in enumerate(samples, first):
+                        yield WRITE, s, value
+        finally:
+            if pool is not None:
+                pool.shutdown(cancel_futures=True)
+        yield AUX, -in_memory, 0
+        stats.passes = 1
+        runs.sort()
+
+        # Merge passes. Each open run gets its own read buffer and the output
+        # one more, all within the memory budget.
+        buffer_bytes = max(4096, min(BUFFER_MAX, memory // (fan_in + 1)) // itemsize * itemsize)
+        buffer_length = buffer_bytes // itemsize
+        while len(runs) > 1:
+            merged = []
+            last_pass = len(runs) <= fan_in
+            if view:
+                yield SEGMENT, 0, 0
+            for g in range(0, len(runs), fan_in):
+                group = runs[g:g + fan_in]
+                lo, hi = group[0][0], group[-1][1]
+                out_path = output if last_pass else os.path.join(workdir, f"pass-{stats.passes}-{g}")
+                yield AUX, buffer_length * (len(group) + 1), 0
+
+                first, last = slots(lo, hi, n, view)
+                if view:
+                    yield SEGMENT, first, last
+                s, pick = first, first * n // view if first < last else -1
+
+                sources = [_read_run(run_path, typecode, buffer_bytes, stats)
+                           for _, _, run_path in group]
+                with open(out_path, "wb") as out:
+                    block = array(typecode)
+                    for k, value in enumerate(heapq.merge(*sources), lo):
+                        block.append(value)
+                        if len(block) >= buffer_length:
+                            block.tofile(out)
+                            stats.bytes_written += len(block) * itemsize
+                            block = array(typecode)
+                        if k == pick:
+                            yield WRITE, s, value
+                            s += 1
+                            pick = s * n // view if s < last else -1
+                        if poll and not k & (POLL_ELEMENTS - 1):
+                            yield None
+                    block.tofile(out)
+                    stats.bytes_written += len(block) * itemsize
+
+                for _, _, run_path in group:
+                    os.remove(run_path)
+                yield AUX, -buffer_length * (len(group) + 1), 0
+                merged.append((lo, hi, out_path))
+            runs = merged
+            stats.passes += 1
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    if view:
+        yield SEGMENT, 0, 0
+        yield SORTED, 0, view
+
+
+def external_sort(path, output, dtype="int32", memory=MEMORY, workers=1, fan_in=FAN_IN,
+                  tmpdir=None):
+    # Plain (non-visualized) entry point; returns the ExternalStats.
+    stats = ExternalStats()
+    for _ in external_sort_steps(path, output, dtype, memory, workers, fan_in, tmpdir, 0, stats):
+        pass
+    return stats
+
+
+def write_random(path, n, dtype="int32", seed=0, block=1 << 20):
+    # A test input of n Uniform values, generated a block at a time.
+    from distributions import generate
+
+    with open(path, "wb") as f:
+        for k, lo in enumerate(range(0, n, block)):
+            values = array(DTYPES[dtype], generate("Uniform", min(block, n - lo), seed + k, "array"))
+            values.tofile(f)
+
+
+def check_sorted(path, dtype, buffer_bytes=BUFFER_MAX):
+    stats = ExternalStats()
+    previous = None
+    for value in _read_run(path, DTYPES[dtype], buffer_bytes, stats):
+        if previous is not None and value < previous:
+            return False
+        previous = value
+    return True
+
+
+def parse_bytes(text):
+    # 64M, 1.5G, 4096 ...
+    units = {"k": 1 << 10, "m": 1 << 20, "g": 1 << 30}
+    try:
+        if text[-1:].lower() in units:
+            return int(float(text[:-1]) * units[text[-1].lower()])
+        return int(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"bad size {text!r}")
+
+
+def main(argv=None):
+    from bench import write_report
+
+    parser = argparse.ArgumentParser(
+        prog="sorting-visualizer.py external",
+        description="Sort a binary file of int32/int64 values that doesn't fit in memory "
+                    "with an external merge sort, and report the I/O it took.")
+    parser.add_argument("input", help="binary file of native-endian integers")
+    parser.add_argument("-o", "--output", help="sorted file (default: INPUT.sorted)")
+    parser.add_argument("-t", "--dtype", choices=DTYPES, default="int32")
+    parser.add_argument("-m", "--memory", type=parse_bytes, default=MEMORY,
+                        help="memory for in-memory runs and merge buffers, e.g. 256M "
+                             "(default: 64M)")
+    parser.add_argument("-w", "--workers", type=int, default=1,
+                        help="processes sorting runs in parallel (default: 1)")
+    parser.add_argument("-k", "--fan-in", type=int, default=FAN_IN,
+                        help=f"runs merged at once (default: {FAN_IN})")
+    parser.add_argument("--tmpdir", help="where to spill runs (default: the system temp dir)")
+    parser.add_argument("--generate", type=int, metavar="N",
+                        help="first write N random values to INPUT")
+    parser.add_argument("-s", "--seed", type=int, default=0)
+    parser.add_argument("--check", action="store_true", help="verify the output is sorted")
+    parser.add_argument("-f", "--format", choices=["json", "csv"], default="json")
+    args = parser.parse_args(argv)
+
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+    output = args.output or args.input + ".sorted"
+
+    try:
+        if args.generate is not None:
+            write_random(args.input, args.generate, args.dtype, args.seed)
+        start = time.perf_counter()
+        stats = external_sort(args.input, output, args.dtype, args.memory, args.workers,
+                              args.fan_in, args.tmpdir)
+        seconds = time.perf_counter() - start
+        if args.check and not check_sorted(output, args.dtype):
+            raise RuntimeError(f"{output} is not sorted")
+    except (OSError, ValueError, RuntimeError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+    result = {"input": args.input, "output": output, "dtype": args.dtype,
+              "memory": args.memory, "workers": args.workers}
+    result.update(stats.as_dict())
+    result["seconds"] = round(seconds, 6)
+    print(f"{args.input}: {stats.n:,} values, {stats.runs} runs, {stats.passes} passes, "
+          f"{seconds:.3f}s", file=sys.stderr)
+    write_report([result], list(result), args.format)
+    return 0
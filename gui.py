@@ -0,0 +1,1723 @@
+import tkinter as tk
+from tkinter import ttk, filedialog, messagebox
+import random
+import math
+import time
+import threading
+import queue
+import os
+
+from complexity import METRICS, MIN_SIZE as MIN_PROFILE_SIZE, ProfileCache, describe, fits, \
+    sweep
+from distributions import DISTRIBUTIONS, generate
+from instrument import Counters
+from playback import SortState, Timeline
+from registry import ALGORITHMS
+from scheduler import Scheduler, SortTask, sort_steps
+from tracefile import BLOCK_STEPS, TraceReader, TraceWriter
+from theme import COLORS, PADDING, bar_geometry, cap_height, column_count, lighten, \
+    segment_color, uses_columns
+import storage
+
+FRAME_MS = 16
+# Steps per frame when counting the full sort a selection is compared with.
+BASELINE_STEPS = 100_000
+MIN_SIZE = 10
+MAX_SIZE = 1_000_000
+# Building a Quicksort Killer array is itself O(n^2) and runs on the main
+# loop, so the app keeps it small (bench and export go up to KILLER_MAX).
+KILLER_GUI_MAX = 1000
+
+
+class Renderer:
+    padding = PADDING
+
+    def __init__(self, canvas, colors):
+        self.canvas = canvas
+        self.colors = colors
+        self.layout = None
+
+    def measure(self, array, dirty, bounds=None):
+        canvas_width = self.canvas.winfo_width()
+        canvas_height = self.canvas.winfo_height()
+
+        if canvas_width <= 1:
+            canvas_width = 1100
+        if canvas_height <= 1:
+            canvas_height = 400
+
+        # Bars are scaled over [low, high], from 0 or the smallest value if
+        # that is negative. A sort mostly permutes the array, so incremental
+        # frames skip the O(n) min()/max() and only widen the range for the
+        # values just written (an external sort's view is written values it
+        # never held). `bounds` is a range known in advance to include.
+        if dirty is None or self.layout is None:
+            low, high = min(array), max(array)
+            if bounds is not None:
+                low, high = min(low, bounds[0]), max(high, bounds[1])
+            low = min(low, 0)
+        else:
+            low, high = self.layout[3:]
+            for i in dirty:
+                val = array[i]
+                if val < low:
+                    low = val
+                elif val > high:
+                    high = val
+        return len(array), canvas_width, canvas_height, low, high
+
+    def color_of(self, i, color_positions, sorted_mask, segment_mask):
+        if i in color_positions:
+            return color_positions[i]
+        if sorted_mask and sorted_mask[i]:
+            return self.colors['sorted']
+        if segment_mask and segment_mask[i]:
+            return segment_color(segment_mask[i])
+        return self.colors['bar']
+
+    def clear(self):
+        self.canvas.delete("all")
+        self.layout = None
+
+
+class BarRenderer(Renderer):
+    def __init__(self, canvas, colors):
+        super().__init__(canvas, colors)
+        self.items = []
+        self.values = []
+        self.bar_colors = []
+        self.highlighted = set()
+        self.light_cache = {}
+
+    def draw(self, array, color_positions=None, dirty=None, sorted_mask=None, segment_mask=None,
+             bounds=None):
+        color_positions = color_positions or {}
+
+        if not array:
+            self.clear()
+            return
+
+        layout = self.measure(array, dirty, bounds)
+        if layout != self.layout:
+            self.rebuild(array, color_positions, sorted_mask, segment_mask, layout)
+            return
+
+        # Only touch bars that can have changed since the last frame: the ones
+        # highlighted then, the ones highlighted now, and the ones the caller
+        # reports as written or (un)marked sorted. No dirty set means any bar
+        # may have changed.
+        if dirty is None:
+            changed = range(len(array))
+        else:
+            changed = self.highlighted | color_positions.keys()
+            changed.update(dirty)
+
+        for i in changed:
+            self.update_bar(i, array[i], self.color_of(i, color_positions, sorted_mask, segment_mask))
+        self.highlighted = set(color_positions)
+
+    def clear(self):
+        super().clear()
+        self.items = []
+        self.values = []
+        self.bar_colors = []
+        self.highlighted = set()
+
+    def rebuild(self, array, color_positions, sorted_mask, segment_mask, layout):
+        self.clear()
+        self.layout = layout
+        n, canvas_width, canvas_height, self.low, high = layout
+        self.bar_width, self.base, self.scale = bar_geometry(n, canvas_width, canvas_height,
+                                                             high, self.low)
+        show_text = self.bar_width > 30
+        heights = storage.scale(array, self.scale, self.low)
+
+        for i, val in enumerate(array):
+            color = self.color_of(i, color_positions, sorted_mask, segment_mask)
+            x0, y0, x1, y1, highlight_height = self.bar_coords(i, heights[i])
+
+            rect = self.canvas.create_rectangle(x0, y0, x1, y1, fill=color, outline='', width=0)
+            highlight = self.canvas.create_rectangle(x0, y1, x1, y1 + highlight_height,
+                                                     fill=self.lighten_color(color), outline='')
+            text = None
+            if show_text:
+                text = self.canvas.create_text((x0 + x1) / 2, y1 - 12, text=str(val),
+                                               fill='white', font=('Segoe UI', 8, 'bold'))
+
+            self.items.append((rect, highlight, text))
+            self.values.append(val)
+            self.bar_colors.append(color)
+
+        self.highlighted = set(color_positions)
+
+    def bar_coords(self, i, bar_height):
+        x0 = self.padding + i * self.bar_width
+        x1 = x0 + self.bar_width - 2
+        y1 = self.base - bar_height
+        return x0, self.base, x1, y1, cap_height(bar_height)
+
+    def update_bar(self, i, val, color):
+        rect, highlight, text = self.items[i]
+
+        if val != self.values[i]:
+            x0, y0, x1, y1, highlight_height = self.bar_coords(i, (val - self.low) * self.scale)
+            self.canvas.coords(rect, x0, y0, x1, y1)
+            self.canvas.coords(highlight, x0, y1, x1, y1 + highlight_height)
+            if text is not None:
+                self.canvas.coords(text, (x0 + x1) / 2, y1 - 12)
+                self.canvas.itemconfig(text, text=str(val))
+            self.values[i] = val
+
+        if color != self.bar_colors[i]:
+            self.canvas.itemconfig(rect, fill=color)
+            self.canvas.itemconfig(highlight, fill=self.lighten_color(color))
+            self.bar_colors[i] = color
+
+    def lighten_color(self, hex_color):
+        if hex_color not in self.light_cache:
+            self.light_cache[hex_color] = lighten(hex_color)
+        return self.light_cache[hex_color]
+
+class ColumnRenderer(Renderer):
+    # For arrays with more elements than there are pixels: elements are binned
+    # into pixel columns and each column is one vertical line from the
+    # smallest to the largest value in its bin. Only columns whose bins were
+    # touched since the last frame are recomputed.
+
+    def __init__(self, canvas, colors):
+        super().__init__(canvas, colors)
+        self.items = []
+        self.drawn = []
+        self.highlighted = set()
+
+    def draw(self, array, color_positions=None, dirty=None, sorted_mask=None, segment_mask=None,
+             bounds=None):
+        color_positions = color_positions or {}
+
+        if not array:
+            self.clear()
+            return
+
+        layout = self.measure(array, dirty, bounds)
+        if layout != self.layout:
+            self.rebuild(layout)
+            dirty = None
+
+        n = len(array)
+        columns = self.columns
+        column_colors = {i * columns // n: color for i, color in color_positions.items()}
+
+        if dirty is None:
+            # Full redraw: get every bin's extent in one vectorized pass.
+            starts = [-(-column * n // columns) for column in range(columns)]
+            for column, extent in enumerate(zip(*storage.column_extents(array, starts))):
+                self.update_column(array, column, column_colors.get(column),
+                                   sorted_mask, segment_mask, extent)
+        else:
+            changed = self.highlighted | column_colors.keys()
+            changed.update({i * columns // n for i in dirty})
+            for column in changed:
+                self.update_column(array, column, column_colors.get(column),
+                                   sorted_mask, segment_mask)
+        self.highlighted = set(column_colors)
+
+    def clear(self):
+        super().clear()
+        self.items = []
+        self.drawn = []
+        self.highlighted = set()
+
+    def rebuild(self, layout):
+        self.clear()
+        self.layout = layout
+        n, canvas_width, canvas_height, self.low, high = layout
+        self.columns = column_count(n, canvas_width)
+        self.column_width = (canvas_width - 2 * self.padding) / self.columns
+        _, self.base, self.scale = bar_geometry(n, canvas_width, canvas_height, high, self.low)
+
+        width = max(1, int(self.column_width))
+        for column in range(self.columns):
+            x = self.padding + (column + 0.5) * self.column_width
+            self.items.append(self.canvas.create_line(x, self.base, x, self.base,
+                                                      fill=self.colors['bar'], width=width))
+        self.drawn = [None] * self.columns
+
+    def update_column(self, array, column, color, sorted_mask, segment_mask, extent=None):
+        # Column c holds the indices i with i * columns // n == c.
+        n = len(array)
+        lo = -(-column * n // self.columns)
+        hi = -(-(column + 1) * n // self.columns)
+        if extent is None:
+            chunk = array[lo:hi]
+            extent = min(chunk), max(chunk)
+        low, high = extent
+
+        if color is None:
+            if sorted_mask and sorted_mask.find(0, lo, hi) == -1:
+                color = self.colors['sorted']
+            elif segment_mask and segment_mask[lo]:
+                color = segment_color(segment_mask[lo])
+            else:
+                color = self.colors['bar']
+
+        state = (low, high, color)
+        if state == self.drawn[column]:
+            return
+
+        line = self.items[column]
+        x = self.padding + (column + 0.5) * self.column_width
+        # Pad by a pixel either way so single-valued bins stay visible.
+        self.canvas.coords(line, x, self.base - (low - self.low) * self.scale + 1,
+                           x, self.base - (high - self.low) * self.scale - 1)
+        if self.drawn[column] is None or color != self.drawn[column][2]:
+            self.canvas.itemconfig(line, fill=color)
+        self.drawn[column] = state
+
+
+class ArrayView:
+    # A canvas and its two renderers, picking one by how many bars fit.
+
+    def __init__(self, canvas, colors):
+        self.canvas = canvas
+        self.bar_renderer = BarRenderer(canvas, colors)
+        self.column_renderer = ColumnRenderer(canvas, colors)
+        self.renderer = self.bar_renderer
+
+    def draw(self, state, color_positions=None, dirty=None):
+        if uses_columns(len(state.array), self.canvas.winfo_width()):
+            renderer = self.column_renderer
+        else:
+            renderer = self.bar_renderer
+        if renderer is not self.renderer:
+            self.renderer.clear()
+            self.renderer = renderer
+            dirty = None
+
+        self.renderer.draw(state.array, color_positions, dirty, state.sorted_mask, state.segment_mask,
+                           state.bounds)
+
+
+class HeatmapOverlay:
+    # A strip along the top of the canvas showing how often each part of the
+    # array was read or written, binned per pixel column like ColumnRenderer.
+    # Brightness is log-scaled so a few hot spots don't wash out the rest.
+    top = 4
+    height = 10
+    ramp = [COLORS['canvas'], '#5f27cd', '#ff4757', '#feca57', '#ffffff']
+
+    def __init__(self, canvas):
+        self.canvas = canvas
+        self.palette = [self.blend(k / 31) for k in range(32)]
+
+    def blend(self, t):
+        t *= len(self.ramp) - 1
+        k = min(int(t), len(self.ramp) - 2)
+        t -= k
+        lo, hi = self.ramp[k], self.ramp[k + 1]
+        channels = [round(int(lo[i:i+2], 16) * (1 - t) + int(hi[i:i+2], 16) * t) for i in (1, 3, 5)]
+        return '#{:02x}{:02x}{:02x}'.format(*channels)
+
+    def draw(self, heatmap):
+        self.clear()
+        if heatmap is None or not heatmap.reads:
+            return
+
+        canvas_width = self.canvas.winfo_width()
+        if canvas_width <= 1:
+            canvas_width = 1100
+        columns = column_count(len(heatmap.reads), canvas_width)
+        column_width = (canvas_width - 2 * Renderer.padding) / columns
+        totals = heatmap.column_totals(columns)
+        peak = math.log1p(max(totals))
+        if not peak:
+            return
+
+        last = len(self.palette) - 1
+        for column, total in enumerate(totals):
+            if total:
+                x0 = Renderer.padding + column * column_width
+                color = self.palette[round(math.log1p(total) / peak * last)]
+                self.canvas.create_rectangle(x0, self.top, x0 + column_width, self.top + self.height,
+                                             fill=color, outline='', tags='heatmap')
+
+    def clear(self):
+        self.canvas.delete('heatmap')
+
+
+class RaceLane:
+    # One algorithm in a race: its own generator over its own copy of the
+    # input, its own SortState and its own canvas.
+
+    def __init__(self, parent, algorithm, array, colors):
+        self.algorithm = algorithm
+        self.colors = colors
+        self.state = SortState(array)
+        self.task = SortTask(sort_steps(algorithm, list(array)), algorithm, self.state.counters)
+        self.step_count = 0
+        self.done = False
+        self.failed = False
+
+        self.frame = tk.Frame(parent, bg=colors['panel'], padx=8, pady=8)
+        self.frame.configure(highlightbackground='#333366', highlightthickness=1)
+        self.title_label = tk.Label(self.frame, text=algorithm,
+                                    bg=colors['panel'], fg=colors['accent'],
+                                    font=('Segoe UI', 12, 'bold'))
+        self.title_label.pack(anchor=tk.W)
+        canvas = tk.Canvas(self.frame, bg=colors['canvas'], highlightthickness=0, height=160)
+        canvas.pack(fill=tk.BOTH, expand=True, pady=4)
+        self.view = ArrayView(canvas, colors)
+        self.stats_label = tk.Label(self.frame, text="",
+                                    bg=colors['panel'], fg='#888888',
+                                    font=('Segoe UI', 10))
+        self.stats_label.pack(anchor=tk.W)
+        self.update_stats()
+
+    def advance(self, budget):
+        # Pulls up to `budget` steps; the task times the generator, apart
+        # from drawing.
+        counters = self.state.counters
+        batch = self.task.take(budget)
+
+        dirty = set()
+        highlights = self.state.apply_all(batch, dirty)
+        self.step_count += len(batch)
+
+        start = time.perf_counter_ns()
+        if self.task.done:
+            self.done = True
+            self.failed = self.task.failed
+            self.finish()
+        else:
+            self.draw(self.state.frame_colors(highlights), self.state.take_dirty(dirty))
+        counters.render_ns += time.perf_counter_ns() - start
+        self.update_stats()
+
+    def finish(self):
+        # Selection lanes run with their default k and show what they
+        # selected, with the k-th smallest of a selection as the pivot.
+        spec = ALGORITHMS.spec(self.algorithm)
+        k = spec.selected(len(self.state.array))
+        if not self.failed:
+            try:
+                spec.verify(self.state.array, self.state.original)
+            except RuntimeError as e:
+                print(f"Error: {self.algorithm}: {e}")
+                self.failed = True
+
+        self.state.pivot = -1
+        self.state.clear_masks()
+        if not self.failed:
+            self.state.sorted_mask[:k] = b'\x01' * k
+            if spec.partial == "select" and k:
+                self.state.pivot = k - 1
+        self.draw(self.state.frame_colors({}))
+
+    def draw(self, color_positions=None, dirty=None):
+        self.view.draw(self.state, color_positions, dirty)
+
+    def seconds(self):
+        return self.state.counters.algorithm_ns / 1e9
+
+    def update_stats(self):
+        counters = self.state.counters
+        self.stats_label.config(text=f"Comparisons {counters.comparisons:,} · "
+                                     f"Swaps {counters.swaps:,} · "
+                                     f"Writes {counters.writes:,} · "
+                                     f"Steps {self.step_count:,} · "
+                                     f"Time {self.seconds():.3f}s")
+
+    def show_place(self, place):
+        medal = {1: '#feca57', 2: '#c8d6e5', 3: '#e58e26'}.get(place, self.colors['text'])
+        self.title_label.config(text=f"#{place}  {self.algorithm}", fg=medal)
+
+
+class RaceWindow:
+    # Runs several algorithms on copies of the main window's array. Every
+    # lane is advanced on the main window's scheduler by the same number of
+    # steps per frame, so lanes finish in order of how many steps they need;
+    # the speed follows the main window's slider.
+
+    def __init__(self, app):
+        self.app = app
+        self.colors = app.colors
+        self.lanes = []
+        self.finish_order = []
+        self.racing = False
+
+        self.window = tk.Toplevel(app.window)
+        self.window.title("Race Mode")
+        self.window.geometry("1600x900")
+        self.window.configure(bg=self.colors['bg'])
+        self.window.protocol("WM_DELETE_WINDOW", self.close)
+
+        controls = tk.Frame(self.window, bg=self.colors['panel'], pady=10, padx=15)
+        controls.pack(fill=tk.X, padx=15, pady=(15, 10))
+
+        picks = tk.LabelFrame(controls, text="Algorithms",
+                              bg=self.colors['panel'],
+                              fg=self.colors['accent'],
+                              font=('Segoe UI', 11, 'bold'),
+                              padx=10, pady=5)
+        picks.pack(side=tk.LEFT)
+
+        defaults = {"Merge Sort", "Quick Sort", "Heap Sort", "Tim Sort"}
+        self.choices = {}
+        for k, name in enumerate(ALGORITHMS):
+            var = tk.BooleanVar(value=name in defaults)
+            tk.Checkbutton(picks, text=name, variable=var,
+                           bg=self.colors['panel'], fg='white',
+                           selectcolor='#2a2a5a',
+                           activebackground=self.colors['panel'],
+                           activeforeground='white',
+                           font=('Segoe UI', 10)).grid(row=k // 6, column=k % 6, sticky=tk.W, padx=4)
+            self.choices[name] = var
+
+        self.start_btn = tk.Button(controls, text="Start Race",
+                                   command=self.start,
+                                   bg='#00d4ff', fg='#0a0a1a',
+                                   font=('Segoe UI', 11, 'bold'),
+                                   padx=20, pady=10,
+                                   cursor='hand2',
+                                   relief=tk.FLAT)
+        self.start_btn.pack(side=tk.LEFT, padx=(20, 8))
+
+        self.stop_btn = tk.Button(controls, text="Stop",
+                                  command=self.stop,
+                                  bg='#ff6b6b', fg='white',
+                                  font=('Segoe UI', 11, 'bold'),
+                                  padx=20, pady=10,
+                                  cursor='hand2',
+                                  relief=tk.FLAT,
+                                  state=tk.DISABLED)
+        self.stop_btn.pack(side=tk.LEFT, padx=8)
+
+        self.result_label = tk.Label(self.window, text="Pick algorithms and start the race.",
+                                     bg=self.colors['bg'], fg='white',
+                                     font=('Segoe UI', 11, 'bold'), anchor=tk.W)
+        self.result_label.pack(fill=tk.X, padx=15)
+
+        self.grid_frame = tk.Frame(self.window, bg=self.colors['bg'])
+        self.grid_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+
+    def start(self):
+        if self.racing:
+            return
+
+        algorithms = [name for name, var in self.choices.items() if var.get()]
+        # The input of the app's current run, not wherever it has got to.
+        array = self.app.state.original
+        if not algorithms or not array:
+            return
+
+        for lane in self.lanes:
+            lane.frame.destroy()
+
+        columns = math.ceil(math.sqrt(len(algorithms)))
+        rows = math.ceil(len(algorithms) / columns)
+        self.lanes = []
+        for k, algorithm in enumerate(algorithms):
+            lane = RaceLane(self.grid_frame, algorithm, array, self.colors)
+            lane.frame.grid(row=k // columns, column=k % columns, sticky='nsew', padx=5, pady=5)
+            self.lanes.append(lane)
+        for column in range(columns):
+            self.grid_frame.columnconfigure(column, weight=1, uniform='lane')
+        for row in range(rows):
+            self.grid_frame.rowconfigure(row, weight=1, uniform='lane')
+
+        # Lay the grid out first so each lane's canvas knows its size.
+        self.window.update_idletasks()
+        for lane in self.lanes:
+            lane.draw()
+
+        self.finish_order = []
+        self.step_budget = 0
+        self.racing = True
+        self.start_btn.config(state=tk.DISABLED)
+        self.stop_btn.config(state=tk.NORMAL)
+        self.result_label.config(text=f"Racing {len(self.lanes)} algorithms on "
+                                      f"{len(array):,} elements...")
+        self.app.scheduler.add(self.play_frame)
+
+    def stop(self):
+        self.racing = False
+
+    def play_frame(self):
+        if not self.racing:
+            self.finish()
+            return False
+
+        self.step_budget += self.app.steps_per_frame()
+        budget = int(self.step_budget)
+        self.step_budget -= budget
+
+        finished = []
+        for lane in self.lanes:
+            if not lane.done:
+                lane.advance(budget)
+                if lane.done and not lane.failed:
+                    finished.append(lane)
+
+        # Lanes that ran out in the same frame are ranked by step count.
+        finished.sort(key=lambda lane: lane.step_count)
+        for lane in finished:
+            self.finish_order.append(lane)
+            lane.show_place(len(self.finish_order))
+
+        if all(lane.done for lane in self.lanes):
+            self.finish()
+            return False
+
+        if finished:
+            self.show_results()
+        return True
+
+    def show_results(self):
+        placed = [f"{place}. {lane.algorithm} ({lane.step_count:,} steps, {lane.seconds():.3f}s)"
+                  for place, lane in enumerate(self.finish_order, 1)]
+        failed = [f"{lane.algorithm} (failed)" for lane in self.lanes if lane.failed]
+        self.result_label.config(text="Finish order: " + "   ".join(placed + failed))
+
+    def finish(self):
+        self.racing = False
+        for lane in self.lanes:
+            lane.task.close()
+        self.show_results()
+        self.start_btn.config(state=tk.NORMAL)
+        self.stop_btn.config(state=tk.DISABLED)
+
+    def close(self):
+        if self.racing:
+            self.app.scheduler.remove(self.play_frame)
+            self.finish()
+        self.window.destroy()
+        self.app.race_window = None
+
+
+class ProfileWindow:
+    # Sweeps the selected algorithm and distribution over n on a background
+    # thread (see complexity.sweep) and plots comparisons, element stores
+    # and algorithm time against n on log-log axes, with the fitted c * n^k
+    # line through each. Sizes already in the cache come back at once.
+    series = [("comparisons", "Comparisons", COLORS['compare']),
+              ("stores", "Stores", COLORS['swap']),
+              ("seconds", "Time", COLORS['sorted'])]
+
+    def __init__(self, app):
+        self.app = app
+        self.colors = app.colors
+        self.algorithm = app.algorithm_var.get()
+        self.distribution = app.distribution_var.get()
+        self.rows = []
+        self.done = False
+        self.row_queue = queue.Queue()
+        self.stop_event = threading.Event()
+
+        self.window = tk.Toplevel(app.window)
+        self.window.title(f"Complexity Profile: {self.algorithm} ({self.distribution})")
+        self.window.geometry("900x640")
+        self.window.configure(bg=self.colors['bg'])
+        self.window.protocol("WM_DELETE_WINDOW", self.close)
+
+        self.result_label = tk.Label(self.window, text="Measuring...",
+                                     bg=self.colors['bg'], fg='white',
+                                     font=('Segoe UI', 11, 'bold'), anchor=tk.W,
+                                     justify=tk.LEFT)
+        self.result_label.pack(fill=tk.X, padx=15, pady=(15, 0))
+
+        self.canvas = tk.Canvas(self.window, bg=self.colors['canvas'], highlightthickness=0)
+        self.canvas.pack(fill=tk.BOTH, expand=True, padx=15, pady=15)
+        self.canvas.bind('<Configure>', lambda e: self.draw())
+
+        self.worker = threading.Thread(target=self.run, daemon=True)
+        self.worker.start()
+        self.after_id = self.window.after(100, self.poll)
+
+    def run(self):
+        try:
+            sweep(self.algorithm, self.distribution, cache=self.app.profile_cache,
+                  progress=self.row_queue.put, stop=self.stop_event)
+        except (OSError, RuntimeError) as e:
+            print(f"Error: {e}")
+        finally:
+            self.row_queue.put(None)
+
+    def poll(self):
+        self.after_id = None
+        try:
+            while True:
+                row = self.row_queue.get_nowait()
+                if row is None:
+                    self.done = True
+                    break
+                self.rows.append(row)
+        except queue.Empty:
+            pass
+
+        self.draw()
+        if self.done:
+            self.app.on_algorithm_change()
+        else:
+            self.after_id = self.window.after(100, self.poll)
+
+    def value(self, row, metric):
+        return row[metric] * 1e6 if metric == "seconds" else row[metric]
+
+    def draw(self):
+        canvas = self.canvas
+        canvas.delete("all")
+        fitted = fits(self.rows) if self.rows else dict.fromkeys(METRICS)
+        best, average, worst, _ = ALGORITHMS.spec(self.algorithm).complexity
+        lines = [f"Theoretical: best {best} · average {average} · worst {worst}"]
+        lines.append("Measured: " + " · ".join(f"{label} {describe(fitted[metric])}"
+                                               for metric, label, _ in self.series) + " s")
+        if not self.done:
+            lines[-1] += "   (measuring...)"
+        self.result_label.config(text="\n".join(lines))
+
+        points = [(row["n"], self.value(row, metric)) for row in self.rows
+                  for metric, _, _ in self.series if row[metric] > 0]
+        width, height = canvas.winfo_width(), canvas.winfo_height()
+        if not points or width < 100 or height < 100:
+            return
+
+        # Whole decades on the y axis, octaves (the sweep's sizes) on x.
+        x_lo, x_hi = math.log2(MIN_PROFILE_SIZE), max(math.log2(n) for n, _ in points)
+        y_lo = math.floor(math.log10(min(v for _, v in points)))
+        y_hi = math.ceil(math.log10(max(v for _, v in points)))
+        x_hi, y_hi = max(x_hi, x_lo + 1), max(y_hi, y_lo + 1)
+        left, right, top, bottom = 70, width - 20, 20, height - 40
+
+        def xy(n, v):
+            return (left + (math.log2(n) - x_lo) / (x_hi - x_lo) * (right - left),
+                    bottom - (math.log10(v) - y_lo) / (y_hi - y_lo) * (bottom - top))
+
+        for decade in range(y_lo, y_hi + 1):
+            _, y = xy(2 ** x_lo, 10 ** decade)
+            canvas.create_line(left, y, right, y, fill='#2a2a5a')
+            canvas.create_text(left - 8, y, text=f"1e{decade}", fill='#888888',
+                               anchor=tk.E, font=('Segoe UI', 9))
+        for octave in range(int(x_lo), int(x_hi) + 1):
+            x, _ = xy(2 ** octave, 10 ** y_lo)
+            canvas.create_line(x, top, x, bottom, fill='#2a2a5a')
+            canvas.create_text(x, bottom + 14, text=f"{2 ** octave:,}", fill='#888888',
+                               font=('Segoe UI', 9))
+        canvas.create_text((left + right) / 2, bottom + 30, text="n", fill='#888888',
+                           font=('Segoe UI', 9))
+
+        for k, (metric, label, color) in enumerate(self.series):
+            series = [xy(row["n"], self.value(row, metric)) for row in self.rows if row[metric] > 0]
+            for x, y in series:
+                canvas.create_oval(x - 3, y - 3, x + 3, y + 3, fill=color, outline='')
+            if fitted[metric] is not None:
+                slope, c, _ = fitted[metric]
+                if metric == "seconds":
+                    c *= 1e6
+                ends = [xy(2 ** x, c * 2 ** (x * slope)) for x in (x_lo, x_hi)]
+                canvas.create_line(*ends[0], *ends[1], fill=color, dash=(4, 3))
+            if metric == "seconds":
+                label += " (µs)"
+            canvas.create_text(left + 10, top + 10 + 16 * k, text=label, fill=color,
+                               anchor=tk.W, font=('Segoe UI', 10, 'bold'))
+
+    def close(self):
+        self.stop_event.set()
+        if self.after_id is not None:
+            self.window.after_cancel(self.after_id)
+        self.window.destroy()
+        self.app.profile_window = None
+
+
+class SortingVisualizer:
+    def __init__(self, trace=None):
+        self.window = tk.Tk()
+        self.window.title("Sorting Algorithm Visualizer")
+        self.window.geometry("1920x1080")
+        self.window.configure(bg='#0a0a1a')
+        self.window.resizable(True, True)
+        
+        self.array_size = 50
+        self.speed = 50
+        self.sorting = False
+        self.start_time = 0
+        self.race_window = None
+        self.profile_window = None
+        # Drives the main sort and the race lanes; see scheduler.py.
+        self.scheduler = Scheduler(self.window.after, self.window.after_cancel, FRAME_MS)
+        self.task = None
+        self.profile_cache = ProfileCache()
+        self.paused = False
+        self.external = None
+        self.trace = None
+        self.run_name = None
+        # How much of the array the run finishes, for selection algorithms.
+        self.run_k = None
+        self.baseline_task = None
+        # (distribution, seed) of the array on screen, for saved traces.
+        self.source = (None, None)
+        
+        self.colors = COLORS
+        self.state = SortState([])
+        self.timeline = None
+
+        self.setup_ui()
+        self.on_algorithm_change()
+        self.generate_array()        
+        self.window.bind('<Configure>', self.on_resize)
+        if trace:
+            self.window.after(0, self.open_trace, trace)
+        self.window.mainloop()
+
+    def setup_ui(self):
+        main_container = tk.Frame(self.window, bg=self.colors['bg'])
+        main_container.pack(fill=tk.BOTH, expand=True, padx=20, pady=20)
+        
+        header_frame = tk.Frame(main_container, bg=self.colors['panel'], pady=20, padx=20)
+        header_frame.pack(fill=tk.X, pady=(0, 15))
+        header_frame.configure(highlightbackground=self.colors['accent'], highlightthickness=2)
+        
+        title_label = tk.Label(header_frame, 
+                               text="Sorting Algorithm Visualizer",
+                               font=('Segoe UI', 24, 'bold'), 
+                               bg=self.colors['panel'],
+                               fg=self.colors['accent'])
+        title_label.pack(pady=(0, 5))
+        
+        subtitle_label = tk.Label(header_frame, 
+                                  text="Visualize how sorting algorithms work step by step",
+                                  font=('Segoe UI', 11), 
+                                  bg=self.colors['panel'],
+                                  fg='#888888')
+        subtitle_label.pack()
+        
+        control_panel = tk.Frame(main_container, bg=self.colors['panel'], pady=20, padx=20)
+        control_panel.pack(fill=tk.X, pady=(0, 15))
+        control_panel.configure(highlightbackground='#333366', highlightthickness=1)
+        controls_row = tk.Frame(control_panel, bg=self.colors['panel'])
+        controls_row.pack(fill=tk.X)
+
+        algo_frame = tk.LabelFrame(controls_row, text="Algorithm", 
+                                   bg=self.colors['panel'],
+                                   fg=self.colors['accent'], 
+                                   font=('Segoe UI', 11, 'bold'),
+                                   padx=15, pady=10)
+        algo_frame.pack(side=tk.LEFT, padx=10)
+
+        self.algorithm_var = tk.StringVar(value="Bubble Sort")
+        algorithms = list(ALGORITHMS)
+
+        style = ttk.Style()
+        style.theme_use('clam')
+        style.configure('Custom.TCombobox', 
+                        fieldbackground='#2a2a5a',
+                        background='#2a2a5a', 
+                        foreground='white',
+                        arrowcolor='white')
+        style.map('Custom.TCombobox', 
+                  fieldbackground=[('readonly', '#2a2a5a')],
+                  selectbackground=[('readonly', '#3a3a7a')])
+
+        self.algo_menu = ttk.Combobox(algo_frame, 
+                                      textvariable=self.algorithm_var,
+                                      values=algorithms, 
+                                      state="readonly", 
+                                      width=20,
+                                      font=('Segoe UI', 11),
+                                      style='Custom.TCombobox')
+        self.algo_menu.pack(padx=5, pady=5)
+        self.algo_menu.bind("<<ComboboxSelected>>", self.on_algorithm_change)
+
+        # Only the selection algorithms take k; blank means their default.
+        k_row = tk.Frame(algo_frame, bg=self.colors['panel'])
+        k_row.pack()
+        tk.Label(k_row, text="k", bg=self.colors['panel'], fg='#888888',
+                 font=('Segoe UI', 10)).pack(side=tk.LEFT)
+        self.k_var = tk.StringVar(value="")
+        self.k_entry = tk.Entry(k_row, textvariable=self.k_var, width=8,
+                                bg='#2a2a5a', fg='white', insertbackground='white',
+                                disabledbackground='#1e1e3f',
+                                relief=tk.FLAT, font=('Segoe UI', 10))
+        self.k_entry.pack(side=tk.LEFT, padx=5)
+
+        dist_frame = tk.LabelFrame(controls_row, text="Input", 
+                                   bg=self.colors['panel'],
+                                   fg=self.colors['accent'], 
+                                   font=('Segoe UI', 11, 'bold'),
+                                   padx=15, pady=10)
+        dist_frame.pack(side=tk.LEFT, padx=10)
+
+        self.distribution_var = tk.StringVar(value="Uniform")
+        self.dist_menu = ttk.Combobox(dist_frame, 
+                                      textvariable=self.distribution_var,
+                                      values=list(DISTRIBUTIONS), 
+                                      state="readonly", 
+                                      width=16,
+                                      font=('Segoe UI', 11),
+                                      style='Custom.TCombobox')
+        self.dist_menu.pack(padx=5, pady=5)
+        self.dist_menu.bind("<<ComboboxSelected>>", lambda e: self.generate_array())
+
+        seed_row = tk.Frame(dist_frame, bg=self.colors['panel'])
+        seed_row.pack()
+        tk.Label(seed_row, text="Seed", bg=self.colors['panel'], fg='#888888',
+                 font=('Segoe UI', 10)).pack(side=tk.LEFT)
+        self.seed_var = tk.StringVar(value="")
+        self.seed_entry = tk.Entry(seed_row, textvariable=self.seed_var, width=8,
+                                   bg='#2a2a5a', fg='white', insertbackground='white',
+                                   relief=tk.FLAT, font=('Segoe UI', 10))
+        self.seed_entry.pack(side=tk.LEFT, padx=5)
+        self.seed_entry.bind("<Return>", lambda e: self.generate_array())
+
+        size_frame = tk.LabelFrame(controls_row, text="Array Size", 
+                                   bg=self.colors['panel'],
+                                   fg=self.colors['accent'], 
+                                   font=('Segoe UI', 11, 'bold'),
+                                   padx=15, pady=10)
+        size_frame.pack(side=tk.LEFT, padx=10)
+
+        # The slider is logarithmic so it can span 10 to a million elements.
+        self.size_var = tk.DoubleVar(value=math.log10(self.array_size))
+        self.size_label = tk.Label(size_frame, text="50", 
+                                   bg=self.colors['panel'], 
+                                   fg='white',
+                                   font=('Segoe UI', 12, 'bold'), width=8)
+        self.size_label.pack()
+        
+        self.size_scale = tk.Scale(size_frame, from_=math.log10(MIN_SIZE), to=math.log10(MAX_SIZE),
+                                   resolution=0.01,
+                                   orient=tk.HORIZONTAL,
+                                   variable=self.size_var, 
+                                   command=self.update_size,
+                                   bg=self.colors['panel'], 
+                                   fg=self.colors['text'],
+                                   highlightthickness=0, 
+                                   troughcolor='#2a2a5a',
+                                   activebackground=self.colors['accent'], 
+                                   length=150,
+                                   showvalue=False,
+                                   sliderlength=20)
+        self.size_scale.pack(padx=5)
+        
+        speed_frame = tk.LabelFrame(controls_row, text="Speed", 
+                                    bg=self.colors['panel'],
+                                    fg=self.colors['accent'], 
+                                    font=('Segoe UI', 11, 'bold'),
+                                    padx=15, pady=10)
+        speed_frame.pack(side=tk.LEFT, padx=10)
+
+        self.speed_var = tk.IntVar(value=50)
+        self.speed_label = tk.Label(speed_frame, text="50%", 
+                                    bg=self.colors['panel'], 
+                                    fg='white',
+                                    font=('Segoe UI', 12, 'bold'), width=4)
+        self.speed_label.pack()
+        
+        self.speed_scale = tk.Scale(speed_frame, from_=1, to=100, 
+                                    orient=tk.HORIZONTAL,
+                                    variable=self.speed_var, 
+                                    command=self.update_speed,
+                                    bg=self.colors['panel'], 
+                                    fg=self.colors['text'],
+                                    highlightthickness=0, 
+                                    troughcolor='#2a2a5a',
+                                    activebackground=self.colors['accent'], 
+                                    length=150,
+                                    showvalue=False,
+                                    sliderlength=20)
+        self.speed_scale.pack(padx=5)
+
+        heatmap_frame = tk.LabelFrame(controls_row, text="Access Heatmap",
+                                      bg=self.colors['panel'],
+                                      fg=self.colors['accent'],
+                                      font=('Segoe UI', 11, 'bold'),
+                                      padx=15, pady=10)
+        heatmap_frame.pack(side=tk.LEFT, padx=10)
+
+        self.heatmap_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(heatmap_frame, text="Show", variable=self.heatmap_var,
+                       command=self.toggle_heatmap,
+                       bg=self.colors['panel'], fg='white',
+                       selectcolor='#2a2a5a',
+                       activebackground=self.colors['panel'],
+                       activeforeground='white',
+                       font=('Segoe UI', 10)).pack(anchor=tk.W)
+        tk.Button(heatmap_frame, text="Export CSV",
+                  command=self.export_heatmap,
+                  bg='#2a2a5a', fg='white',
+                  font=('Segoe UI', 9, 'bold'),
+                  cursor='hand2',
+                  relief=tk.FLAT).pack(pady=(4, 0))
+
+        trace_frame = tk.LabelFrame(controls_row, text="Trace",
+                                    bg=self.colors['panel'],
+                                    fg=self.colors['accent'],
+                                    font=('Segoe UI', 11, 'bold'),
+                                    padx=15, pady=10)
+        trace_frame.pack(side=tk.LEFT, padx=10)
+
+        self.save_trace_btn = tk.Button(trace_frame, text="Save",
+                                        command=self.save_trace,
+                                        bg='#2a2a5a', fg='white',
+                                        font=('Segoe UI', 9, 'bold'),
+                                        cursor='hand2',
+                                        relief=tk.FLAT)
+        self.save_trace_btn.pack(fill=tk.X)
+        self.open_trace_btn = tk.Button(trace_frame, text="Open…",
+                                        command=self.open_trace,
+                                        bg='#2a2a5a', fg='white',
+                                        font=('Segoe UI', 9, 'bold'),
+                                        cursor='hand2',
+                                        relief=tk.FLAT)
+        self.open_trace_btn.pack(fill=tk.X, pady=(4, 0))
+      
+        btn_frame = tk.Frame(controls_row, bg=self.colors['panel'])
+        btn_frame.pack(side=tk.RIGHT, padx=20)
+        
+        self.generate_btn = tk.Button(btn_frame, text="Generate New Array",
+                                      command=self.generate_array,
+                                      bg='#e74c3c', fg='white', 
+                                      font=('Segoe UI', 11, 'bold'),
+                                      padx=20, pady=12, 
+                                      cursor='hand2', 
+                                      relief=tk.FLAT,
+                                      activebackground='#c0392b',
+                                      activeforeground='white')
+        self.generate_btn.pack(side=tk.LEFT, padx=8)
+        self.add_button_hover(self.generate_btn, '#e74c3c', '#c0392b')
+        
+        self.sort_btn = tk.Button(btn_frame, text="Start Sorting",
+                                  command=self.start_sort,
+                                  bg='#00d4ff', fg='#0a0a1a', 
+                                  font=('Segoe UI', 11, 'bold'),
+                                  padx=20, pady=12, 
+                                  cursor='hand2', 
+                                  relief=tk.FLAT,
+                                  activebackground='#00a8cc',
+                                  activeforeground='#0a0a1a')
+        self.sort_btn.pack(side=tk.LEFT, padx=8)
+        self.add_button_hover(self.sort_btn, '#00d4ff', '#00a8cc')
+
+        self.stop_btn = tk.Button(btn_frame, text="Stop",
+                                  command=self.stop_sort,
+                                  bg='#ff6b6b', fg='white', 
+                                  font=('Segoe UI', 11, 'bold'),
+                                  padx=20, pady=12, 
+                                  cursor='hand2', 
+                                  relief=tk.FLAT,
+                                  activebackground='#ee5a5a', 
+                                  state=tk.DISABLED)
+        self.stop_btn.pack(side=tk.LEFT, padx=8)
+
+        self.race_btn = tk.Button(btn_frame, text="Race",
+                                  command=self.open_race,
+                                  bg='#a55eea', fg='white',
+                                  font=('Segoe UI', 11, 'bold'),
+                                  padx=20, pady=12,
+                                  cursor='hand2',
+                                  relief=tk.FLAT,
+                                  activebackground='#8854d0',
+                                  activeforeground='white')
+        self.race_btn.pack(side=tk.LEFT, padx=8)
+        self.add_button_hover(self.race_btn, '#a55eea', '#8854d0')
+
+        self.file_btn = tk.Button(btn_frame, text="Sort File…",
+                                  command=self.open_external,
+                                  bg='#2a2a5a', fg='white',
+                                  font=('Segoe UI', 11, 'bold'),
+                                  padx=20, pady=12,
+                                  cursor='hand2',
+                                  relief=tk.FLAT,
+                                  activebackground='#3a3a7a',
+                                  activeforeground='white')
+        self.file_btn.pack(side=tk.LEFT, padx=8)
+        self.add_button_hover(self.file_btn, '#2a2a5a', '#3a3a7a')
+        
+        stats_panel = tk.Frame(main_container, bg=self.colors['panel'], pady=15)
+        stats_panel.pack(fill=tk.X, pady=(0, 15))
+        stats_panel.configure(highlightbackground='#333366', highlightthickness=1)
+        stats_container = tk.Frame(stats_panel, bg=self.colors['panel'])
+        stats_container.pack()
+
+        comp_frame = tk.Frame(stats_container, bg='#2a2a5a', padx=20, pady=10)
+        comp_frame.pack(side=tk.LEFT, padx=15)
+        tk.Label(comp_frame, text="Comparisons", bg='#2a2a5a', fg='#888888',
+                 font=('Segoe UI', 10)).pack()
+        self.comparisons_label = tk.Label(comp_frame, text="0",
+                                          bg='#2a2a5a', fg='#ff4757',
+                                          font=('Segoe UI', 20, 'bold'))
+        self.comparisons_label.pack()
+        self.saved_label = tk.Label(comp_frame, text="",
+                                    bg='#2a2a5a', fg='#888888',
+                                    font=('Segoe UI', 9))
+        self.saved_label.pack()
+        
+        swap_frame = tk.Frame(stats_container, bg='#2a2a5a', padx=20, pady=10)
+        swap_frame.pack(side=tk.LEFT, padx=15)
+        tk.Label(swap_frame, text="Swaps", bg='#2a2a5a', fg='#888888',
+                 font=('Segoe UI', 10)).pack()
+        self.swaps_label = tk.Label(swap_frame, text="0",
+                                    bg='#2a2a5a', fg='#ffa502',
+                                    font=('Segoe UI', 20, 'bold'))
+        self.swaps_label.pack()
+
+        write_frame = tk.Frame(stats_container, bg='#2a2a5a', padx=20, pady=10)
+        write_frame.pack(side=tk.LEFT, padx=15)
+        tk.Label(write_frame, text="Writes", bg='#2a2a5a', fg='#888888',
+                 font=('Segoe UI', 10)).pack()
+        self.writes_label = tk.Label(write_frame, text="0",
+                                     bg='#2a2a5a', fg='#feca57',
+                                     font=('Segoe UI', 20, 'bold'))
+        self.writes_label.pack()
+
+        read_frame = tk.Frame(stats_container, bg='#2a2a5a', padx=20, pady=10)
+        read_frame.pack(side=tk.LEFT, padx=15)
+        tk.Label(read_frame, text="Reads", bg='#2a2a5a', fg='#888888',
+                 font=('Segoe UI', 10)).pack()
+        self.reads_label = tk.Label(read_frame, text="0",
+                                    bg='#2a2a5a', fg='#70a1ff',
+                                    font=('Segoe UI', 20, 'bold'))
+        self.reads_label.pack()
+
+        aux_frame = tk.Frame(stats_container, bg='#2a2a5a', padx=20, pady=10)
+        aux_frame.pack(side=tk.LEFT, padx=15)
+        tk.Label(aux_frame, text="Aux Memory (peak)", bg='#2a2a5a', fg='#888888',
+                 font=('Segoe UI', 10)).pack()
+        self.aux_label = tk.Label(aux_frame, text="0",
+                                  bg='#2a2a5a', fg='#ff9ff3',
+                                  font=('Segoe UI', 20, 'bold'))
+        self.aux_label.pack()
+
+        time_frame = tk.Frame(stats_container, bg='#2a2a5a', padx=20, pady=10)
+        time_frame.pack(side=tk.LEFT, padx=15)
+        tk.Label(time_frame, text="Algorithm Time", bg='#2a2a5a', fg='#888888',
+                 font=('Segoe UI', 10)).pack()
+        self.time_label = tk.Label(time_frame, text="0.000s",
+                                   bg='#2a2a5a', fg='#2ed573',
+                                   font=('Segoe UI', 20, 'bold'))
+        self.time_label.pack()
+        self.time_detail_label = tk.Label(time_frame, text="",
+                                          bg='#2a2a5a', fg='#888888',
+                                          font=('Segoe UI', 9))
+        self.time_detail_label.pack()
+        
+        complexity_frame = tk.Frame(stats_container, bg='#2a2a5a', padx=20, pady=10)
+        complexity_frame.pack(side=tk.LEFT, padx=15)
+        tk.Label(complexity_frame, text="📈 Time Complexity", bg='#2a2a5a', fg='#888888',
+                 font=('Segoe UI', 10)).pack()
+        self.complexity_label = tk.Label(complexity_frame, text="O(n²)",
+                                         bg='#2a2a5a', fg=self.colors['accent'],
+                                         font=('Segoe UI', 20, 'bold'))
+        self.complexity_label.pack()
+        self.complexity_detail_label = tk.Label(complexity_frame, text="",
+                                                bg='#2a2a5a', fg='#888888',
+                                                font=('Segoe UI', 9))
+        self.complexity_detail_label.pack()
+        self.measured_label = tk.Label(complexity_frame, text="",
+                                       bg='#2a2a5a', fg='#2ed573',
+                                       font=('Segoe UI', 9))
+        self.measured_label.pack()
+        self.profile_btn = tk.Button(complexity_frame, text="Profile…",
+                                     command=self.open_profile,
+                                     bg='#1e1e3f', fg='white',
+                                     font=('Segoe UI', 9, 'bold'),
+                                     cursor='hand2',
+                                     relief=tk.FLAT)
+        self.profile_btn.pack(pady=(4, 0))
+        
+        canvas_frame = tk.Frame(main_container, bg=self.colors['panel'], padx=15, pady=15)
+        canvas_frame.pack(fill=tk.BOTH, expand=True)
+        canvas_frame.configure(highlightbackground='#333366', highlightthickness=1)
+
+        self.canvas = tk.Canvas(canvas_frame, bg=self.colors['canvas'], highlightthickness=0)
+        self.canvas.pack(fill=tk.BOTH, expand=True)
+        self.view = ArrayView(self.canvas, self.colors)
+        self.heatmap_overlay = HeatmapOverlay(self.canvas)
+
+        # Scrubbing over everything played so far; see playback.Timeline.
+        timeline_frame = tk.Frame(canvas_frame, bg=self.colors['panel'])
+        timeline_frame.pack(fill=tk.X, pady=(10, 0))
+
+        self.step_back_btn = tk.Button(timeline_frame, text="◀ Step",
+                                       command=lambda: self.step_timeline(-1),
+                                       bg='#2a2a5a', fg='white',
+                                       font=('Segoe UI', 10, 'bold'),
+                                       cursor='hand2',
+                                       relief=tk.FLAT,
+                                       state=tk.DISABLED)
+        self.step_back_btn.pack(side=tk.LEFT, padx=4)
+
+        self.pause_btn = tk.Button(timeline_frame, text="Pause", width=7,
+                                   command=self.toggle_pause,
+                                   bg='#2a2a5a', fg='white',
+                                   font=('Segoe UI', 10, 'bold'),
+                                   cursor='hand2',
+                                   relief=tk.FLAT,
+                                   state=tk.DISABLED)
+        self.pause_btn.pack(side=tk.LEFT, padx=4)
+
+        self.step_forward_btn = tk.Button(timeline_frame, text="Step ▶",
+                                          command=lambda: self.step_timeline(1),
+                                          bg='#2a2a5a', fg='white',
+                                          font=('Segoe UI', 10, 'bold'),
+                                          cursor='hand2',
+                                          relief=tk.FLAT,
+                                          state=tk.DISABLED)
+        self.step_forward_btn.pack(side=tk.LEFT, padx=4)
+
+        self.timeline_label = tk.Label(timeline_frame, text="Step 0 / 0",
+                                       bg=self.colors['panel'], fg='#888888',
+                                       font=('Segoe UI', 10), width=24, anchor=tk.E)
+        self.timeline_label.pack(side=tk.RIGHT, padx=4)
+
+        self.timeline_var = tk.IntVar(value=0)
+        self.timeline_scale = tk.Scale(timeline_frame, from_=0, to=0,
+                                       orient=tk.HORIZONTAL,
+                                       variable=self.timeline_var,
+                                       command=self.scrub,
+                                       bg=self.colors['panel'],
+                                       fg=self.colors['text'],
+                                       highlightthickness=0,
+                                       troughcolor='#2a2a5a',
+                                       activebackground=self.colors['accent'],
+                                       showvalue=False,
+                                       sliderlength=14,
+                                       state=tk.DISABLED)
+        self.timeline_scale.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=10)
+
+        legend_frame = tk.Frame(main_container, bg=self.colors['panel'], pady=12)
+        legend_frame.pack(fill=tk.X, pady=(15, 0))
+        legend_frame.configure(highlightbackground='#333366', highlightthickness=1)
+
+        legend_title = tk.Label(legend_frame, text="Color Legend:", 
+                                bg=self.colors['panel'], fg=self.colors['text'],
+                                font=('Segoe UI', 11, 'bold'))
+        legend_title.pack(side=tk.LEFT, padx=20)
+
+        legends = [
+            ("Normal", self.colors['bar'], "🔵"),
+            ("Comparing", self.colors['compare'], "🔴"),
+            ("Swapping", self.colors['swap'], "🟡"),
+            ("Sorted", self.colors['sorted'], "🟢"),
+            ("Pivot", self.colors['pivot'], "🟢"),
+            ("Worker / Bucket", self.colors['segments'][0], "🟣"),
+        ]
+
+        for text, color, emoji in legends:
+            leg_item = tk.Frame(legend_frame, bg=self.colors['panel'])
+            leg_item.pack(side=tk.LEFT, padx=20)
+
+            color_box = tk.Canvas(leg_item, width=25, height=25, bg=color, 
+                                  highlightthickness=2, highlightbackground='white')
+            color_box.pack(side=tk.LEFT, padx=5)
+
+            tk.Label(leg_item, text=f"{emoji} {text}", 
+                     bg=self.colors['panel'], fg=self.colors['text'],
+                     font=('Segoe UI', 10, 'bold')).pack(side=tk.LEFT)
+
+    def add_button_hover(self, button, normal_color, hover_color):
+        def on_enter(e):
+            button['background'] = hover_color
+        def on_leave(e):
+            button['background'] = normal_color
+        button.bind("<Enter>", on_enter)
+        button.bind("<Leave>", on_leave)
+
+    def on_resize(self, event=None):
+        if not self.sorting and self.state.array:
+            self.draw_array()
+            self.toggle_heatmap()
+
+    def on_algorithm_change(self, event=None):
+        algo = self.algorithm_var.get()
+        spec = ALGORITHMS.spec(algo)
+        best, average, worst, space = spec.complexity
+        self.complexity_label.config(text=average)
+        self.complexity_detail_label.config(text=" · ".join(
+            [f"Best {best}", f"Worst {worst}", f"Space {space}"] + spec.capabilities))
+        self.k_entry.config(state=tk.NORMAL if spec.partial else tk.DISABLED)
+
+        # The measured growth on this distribution, if it has been profiled.
+        rows = sweep(algo, self.distribution_var.get(), cache=self.profile_cache, run=False)
+        if rows:
+            fitted = fits(rows)
+            self.measured_label.config(text=f"Measured: comparisons {describe(fitted['comparisons'])} · "
+                                            f"time {describe(fitted['seconds'])} s")
+        else:
+            self.measured_label.config(text="Measured: not profiled yet")
+
+    def update_size(self, val):
+        if not self.sorting:
+            self.array_size = int(round(10 ** float(val)))
+            self.size_label.config(text=f"{self.array_size:,}")
+            self.generate_array()
+
+    def update_speed(self, val):
+        self.speed = int(val)
+        self.speed_label.config(text=f"{self.speed}%")
+
+    def generate_array(self):
+        if self.sorting:
+            return
+
+        # A blank (or non-numeric) seed gives a fresh random array every time.
+        try:
+            seed = int(self.seed_var.get())
+        except ValueError:
+            seed = random.randrange(2 ** 32)
+
+        if self.distribution_var.get() == "Quicksort Killer" and self.array_size > KILLER_GUI_MAX:
+            print(f"Error: Quicksort Killer is limited to {KILLER_GUI_MAX:,} elements in the app")
+            return
+
+        # Always the list generators: NumPy's draw different arrays for the
+        # same seed, and bench and trace record use these.
+        try:
+            values = generate(self.distribution_var.get(), self.array_size, seed, "list")
+        except ValueError as e:
+            print(f"Error: {e}")
+            return
+
+        self.state = SortState(values)
+        self.cancel_baseline()
+        self.timeline = None
+        self.external = None
+        self.trace = None
+        self.source = (self.distribution_var.get(), seed)
+        self.on_algorithm_change()
+        self.heatmap_overlay.clear()
+        self.update_stats()
+        self.update_timeline()
+        self.draw_array()
+
+    def draw_array(self, color_positions=None, dirty=None):
+        self.view.draw(self.state, color_positions, dirty)
+        self.window.update_idletasks()
+
+    def update_stats(self):
+        # Time is what the algorithm itself took (measured inside its
+        # generator); drawing and the playback speed only count as render/wall.
+        counters = self.state.counters
+        elapsed = time.time() - self.start_time if self.start_time else 0
+        self.comparisons_label.config(text=str(counters.comparisons))
+        self.swaps_label.config(text=str(counters.swaps))
+        self.writes_label.config(text=str(counters.writes))
+        self.reads_label.config(text=str(counters.reads))
+        self.aux_label.config(text=str(counters.peak_aux))
+        self.time_label.config(text=f"{counters.algorithm_ns / 1e9:.3f}s")
+        self.time_detail_label.config(text=f"Render {counters.render_ns / 1e9:.3f}s · "
+                                           f"Wall {elapsed:.3f}s")
+        if self.external is not None:
+            stats = self.external
+            self.complexity_detail_label.config(
+                text=f"{stats.n:,} values · {stats.runs} runs · {stats.passes} passes · "
+                     f"read {stats.bytes_read / 1e6:.1f} MB · wrote {stats.bytes_written / 1e6:.1f} MB")
+
+    def toggle_heatmap(self):
+        if self.heatmap_var.get():
+            self.heatmap_overlay.draw(self.state.heatmap)
+        else:
+            self.heatmap_overlay.clear()
+
+    def export_heatmap(self):
+        if self.state.heatmap is None:
+            print("Error: no heatmap yet; run a sort first")
+            return
+        path = filedialog.asksaveasfilename(defaultextension=".csv",
+                                            filetypes=[("CSV", "*.csv")])
+        if not path:
+            return
+        try:
+            self.state.heatmap.export(path)
+        except OSError as e:
+            print(f"Error: {e}")
+
+    def steps_per_frame(self):
+        # 1% plays about 10 steps per second and 100% about a million, so at
+        # the top of the slider thousands of steps are coalesced into a frame.
+        steps_per_second = 10 ** (1 + 5 * ((self.speed - 1) / 99) ** 2)
+        return steps_per_second * FRAME_MS / 1000
+
+    def start_sort(self, steps=None, name=None, external=None, trace=None):
+        # `steps` replaces the selected algorithm (see open_external and
+        # open_trace); `name` is what it is called in messages and traces.
+        if self.sorting:
+            return
+
+        self.start_time = time.time()
+        # The heatmap probe is only attached when it is shown.
+        self.state = SortState(self.state.array, heatmap=self.heatmap_var.get(),
+                               typecode=self.state.typecode, bounds=self.state.bounds)
+        self.timeline = Timeline(self.state)
+        self.paused = False
+        self.external = external
+        self.trace = trace
+        self.run_name = name or self.algorithm_var.get()
+        self.run_k = trace.meta.get("k") if trace is not None else None
+        self.cancel_baseline()
+        # A trace knows how long its algorithm took; decoding it doesn't count.
+        if trace is not None:
+            self.state.counters.algorithm_ns = trace.algorithm_ns
+        self.heatmap_overlay.clear()
+        self.last_heatmap = 0
+        self.step_budget = 0
+
+        # The sort runs only as play_frame pulls steps from it, on the main
+        # loop; there is no worker thread.
+        if steps is None:
+            spec = ALGORITHMS.spec(self.run_name)
+            if spec.partial:
+                self.run_k = spec.selected(len(self.state.array), self.k_value())
+            steps = sort_steps(self.run_name, list(self.state.array), k=self.run_k)
+        self.task = SortTask(steps, self.run_name, None if trace else self.state.counters)
+
+        # Only once the setup above has worked, so a failure there leaves the
+        # controls usable.
+        self.sorting = True
+        self.sort_btn.config(state=tk.DISABLED)
+        self.generate_btn.config(state=tk.DISABLED)
+        self.stop_btn.config(state=tk.NORMAL)
+        self.size_scale.config(state=tk.DISABLED)
+        self.algo_menu.config(state=tk.DISABLED)
+        self.k_entry.config(state=tk.DISABLED)
+        self.dist_menu.config(state=tk.DISABLED)
+        self.file_btn.config(state=tk.DISABLED)
+        self.race_btn.config(state=tk.DISABLED)
+        self.profile_btn.config(state=tk.DISABLED)
+        self.save_trace_btn.config(state=tk.DISABLED)
+        self.open_trace_btn.config(state=tk.DISABLED)
+        self.update_timeline()
+        self.scheduler.add(self.play_frame)
+
+    def stop_sort(self):
+        # A paused sort isn't scheduled; wake it up to finish.
+        self.sorting = False
+        self.scheduler.add(self.play_frame)
+
+    def take_live_steps(self, count):
+        # Up to `count` new steps from the sort; [] at the end, or while it
+        # waits on something (see scheduler.py).
+        return self.task.take(count)
+
+    def play_frame(self):
+        # A scheduler client: returning False unschedules it, so a paused
+        # sort costs nothing until toggle_pause or stop_sort adds it back.
+        if not self.sorting:
+            self.task.close()
+            self.finish_sort()
+            return False
+
+        if self.paused:
+            return False
+
+        self.step_budget += self.steps_per_frame()
+        highlights = {}
+        dirty = set()
+        timeline = self.timeline
+        starved = False
+
+        # After scrubbing back, play the logged steps again before taking
+        # new ones from the sort.
+        while self.step_budget >= 1:
+            if timeline.position < timeline.end:
+                take = min(int(self.step_budget), timeline.end - timeline.position)
+                highlights = timeline.forward(self.state, take, dirty)
+            else:
+                steps = self.take_live_steps(int(self.step_budget))
+                if not steps:
+                    starved = True
+                    break
+                take = len(steps)
+                highlights = timeline.record(steps, self.state, dirty)
+            self.step_budget -= take
+
+        if self.task.done and timeline.position == timeline.end:
+            # An external sort's view is a sample of the file, not a
+            # permutation of the one it started from.
+            spec = ALGORITHMS.spec(self.run_name) if self.run_name in ALGORITHMS else None
+            try:
+                if self.external is not None:
+                    if not storage.is_sorted(self.state.array):
+                        raise RuntimeError("result is not sorted")
+                elif spec is not None:
+                    spec.verify(self.state.array, self.state.original, self.run_k)
+                else:
+                    storage.verify(self.state.array, self.state.original)
+            except RuntimeError as e:
+                print(f"Error: {self.run_name}: {e}")
+            # A selection leaves its k-th smallest in the pivot colour.
+            selection = spec is not None and spec.partial == "select" and self.run_k
+            self.state.pivot = self.run_k - 1 if selection else -1
+            self.update_stats()
+            self.state.clear_masks()
+            self.draw_array(self.state.frame_colors({}))
+            self.toggle_heatmap()
+            if spec is not None and spec.baseline and not self.task.failed:
+                self.count_baseline(spec.baseline)
+            self.show_sorted_animation()
+            return False
+
+        # The sort had nothing ready: don't let the budget pile up while it
+        # waits.
+        if starved:
+            self.step_budget = min(self.step_budget, 1)
+
+        start = time.perf_counter_ns()
+        self.draw_array(self.state.frame_colors(highlights), self.state.take_dirty(dirty))
+        # The overlay is a full O(n) rebin, so refresh it a few times a second.
+        if self.heatmap_var.get() and time.time() - self.last_heatmap > 0.25:
+            self.heatmap_overlay.draw(self.state.heatmap)
+            self.last_heatmap = time.time()
+        self.state.counters.render_ns += time.perf_counter_ns() - start
+        self.update_stats()
+        self.update_timeline()
+        return True
+
+    def update_timeline(self):
+        timeline = self.timeline
+        if timeline is None:
+            self.timeline_var.set(0)
+            self.timeline_scale.config(from_=0, to=0, state=tk.DISABLED)
+            self.timeline_label.config(text="Step 0 / 0")
+            for button in (self.step_back_btn, self.pause_btn, self.step_forward_btn):
+                button.config(state=tk.DISABLED)
+            return
+
+        # Steps before timeline.start were dropped to bound memory.
+        self.timeline_scale.config(from_=timeline.start, to=timeline.end, state=tk.NORMAL)
+        self.timeline_var.set(timeline.position)
+        self.timeline_label.config(text=f"Step {timeline.position:,} / {timeline.end:,}")
+        self.step_back_btn.config(state=tk.NORMAL)
+        self.step_forward_btn.config(state=tk.NORMAL)
+        self.pause_btn.config(state=tk.NORMAL if self.sorting else tk.DISABLED,
+                              text="Resume" if self.paused else "Pause")
+
+    def toggle_pause(self):
+        if self.sorting:
+            self.paused = not self.paused
+            if not self.paused:
+                self.scheduler.add(self.play_frame)
+            self.update_timeline()
+
+    def step_timeline(self, delta):
+        if self.timeline is None:
+            return
+        target = self.timeline.position + delta
+        if self.sorting:
+            self.paused = True
+            # Stepping past the end plays the sort's next step, if any.
+            if delta > 0 and self.timeline.position == self.timeline.end:
+                steps = self.take_live_steps(delta)
+                if steps:
+                    self.timeline.record(steps, self.state, set())
+        self.seek(target)
+
+    def scrub(self, val):
+        # The slider also reports the positions update_timeline sets.
+        target = int(float(val))
+        if self.timeline is None or target == self.timeline.position:
+            return
+        if self.sorting:
+            self.paused = True
+        self.seek(target)
+
+    def seek(self, target):
+        self.timeline.seek(self.state, target)
+        step = self.timeline.last_step()
+        highlights = self.state.highlight(step) if step else {}
+        self.draw_array(self.state.frame_colors(highlights), self.state.take_dirty(set()))
+        self.update_stats()
+        self.update_timeline()
+
+    def finish_sort(self):
+        self.sorting = False
+        self.paused = False
+        self.sort_btn.config(state=tk.NORMAL)
+        self.generate_btn.config(state=tk.NORMAL)
+        self.stop_btn.config(state=tk.DISABLED)
+        self.size_scale.config(state=tk.NORMAL)
+        self.algo_menu.config(state='readonly')
+        self.k_entry.config(state=tk.NORMAL if ALGORITHMS.spec(self.algorithm_var.get()).partial
+                            else tk.DISABLED)
+        self.dist_menu.config(state='readonly')
+        self.file_btn.config(state=tk.NORMAL)
+        self.race_btn.config(state=tk.NORMAL)
+        self.profile_btn.config(state=tk.NORMAL)
+        self.save_trace_btn.config(state=tk.NORMAL)
+        self.open_trace_btn.config(state=tk.NORMAL)
+        self.update_timeline()
+
+    def show_sorted_animation(self, i=0):
+        # Sweeps the sorted colour over what the run finished: all of it, or
+        # the selected k.
+        if not self.sorting:
+            self.finish_sort()
+            return
+
+        n = len(self.state.array) if self.run_k is None else self.run_k
+        colors = self.state.frame_colors({})
+        if i < n:
+            end = min(n, i + max(1, n // 150))
+            self.state.sorted_mask[i:end] = b'\x01' * (end - i)
+            self.draw_array(colors, dirty=range(i, end))
+            self.window.after(20, self.show_sorted_animation, end)
+            return
+
+        self.draw_array(colors)
+        self.finish_sort()
+
+    def k_value(self):
+        # None (the algorithm's default) unless k is a positive number.
+        try:
+            k = int(self.k_var.get())
+        except ValueError:
+            return None
+        return k if k > 0 else None
+
+    def count_baseline(self, baseline):
+        # Runs the full sort a selection is measured against on the same
+        # input, off screen and a slice per frame, then reports the
+        # comparisons the selection saved.
+        comparisons = self.state.counters.comparisons
+        task = SortTask(sort_steps(baseline, list(self.state.original)), baseline)
+        counters = Counters()
+        self.baseline_task = task
+        self.saved_label.config(text=f"Counting a full {baseline}…")
+
+        def count():
+            if self.baseline_task is not task:
+                return False
+            counters.consume(task.take(BASELINE_STEPS))
+            if not task.done:
+                return True
+            self.baseline_task = None
+            full = counters.comparisons
+            saved = full - comparisons
+            if task.failed or not full:
+                self.saved_label.config(text="")
+            elif saved >= 0:
+                self.saved_label.config(text=f"{saved:,} fewer than {baseline} "
+                                             f"({saved / full:.0%})")
+            else:
+                self.saved_label.config(text=f"{-saved:,} more than {baseline}")
+            return False
+
+        self.scheduler.add(count)
+
+    def cancel_baseline(self):
+        if self.baseline_task is not None:
+            self.baseline_task.close()
+            self.baseline_task = None
+        self.saved_label.config(text="")
+
+    def open_external(self):
+        # Sorts a binary int32/int64 file with external.py; the canvas shows a
+        # downsampled view of it while runs are formed and merged.
+        from external import DTYPES, VIEW_SIZE, ExternalStats, external_sort_steps, sample_file, \
+            value_range
+
+        if self.sorting:
+            return
+        path = filedialog.askopenfilename(title="Sort a binary file of integers",
+                                          filetypes=[("Binary integers", "*.bin *.i32 *.i64 *.dat"),
+                                                     ("All files", "*")])
+        if not path:
+            return
+        output = path + ".sorted"
+        try:
+            # The extension names the type if it can; otherwise a size that
+            # only fits int32 decides, and else the user is asked.
+            if path.endswith((".i64", ".int64")):
+                dtype = "int64"
+            elif path.endswith((".i32", ".int32")) or os.path.getsize(path) % 8:
+                dtype = "int32"
+            else:
+                answer = messagebox.askyesnocancel(
+                    "Sort File", f"Read {os.path.basename(path)} as 64-bit integers?\n"
+                                 "(No reads it as 32-bit.)")
+                if answer is None:
+                    return
+                dtype = "int64" if answer else "int32"
+            # Checks the size is a whole number of elements of that type.
+            view = sample_file(path, dtype, VIEW_SIZE)
+            if not view:
+                return
+            bounds = value_range(path, dtype)
+        except (OSError, ValueError) as e:
+            print(f"Error: {e}")
+            return
+        if os.path.exists(output) and not messagebox.askyesno(
+                "Sort File", f"{os.path.basename(output)} already exists. Replace it?"):
+            return
+
+        stats = ExternalStats()
+        self.state = SortState(view, typecode=DTYPES[dtype], bounds=bounds)
+        self.source = (None, None)
+        self.heatmap_overlay.clear()
+        self.draw_array()
+        self.complexity_label.config(text="External")
+        self.measured_label.config(text="")
+        steps = external_sort_steps(path, output, dtype, workers=os.cpu_count() or 1,
+                                    view=len(view), stats=stats, poll=True)
+        self.start_sort(steps, "External Sort", external=stats)
+
+    def save_trace(self):
+        # Saves the last run from its timeline, so it can be replayed later
+        # without sorting again.
+        timeline = self.timeline
+        if self.sorting or timeline is None:
+            print("Error: no run to save; run a sort first")
+            return
+        if self.state.typecode != 'i':
+            print("Error: traces hold int32 values; this run's are int64")
+            return
+        if timeline.start > 0:
+            print("Error: this run is too long to save; its oldest steps were dropped")
+            return
+        path = filedialog.asksaveasfilename(defaultextension=".trc",
+                                            filetypes=[("Sort trace", "*.trc")])
+        if not path:
+            return
+
+        distribution, seed = self.source
+        try:
+            with TraceWriter(path, self.state.original, self.run_name, distribution, seed,
+                             k=self.run_k) as writer:
+                writer.algorithm_ns = self.state.counters.algorithm_ns
+                for lo in range(0, timeline.end, BLOCK_STEPS):
+                    writer.write(timeline.steps(lo, min(lo + BLOCK_STEPS, timeline.end)))
+        except (OSError, ValueError) as e:
+            print(f"Error: {e}")
+
+    def open_trace(self, path=None):
+        if self.sorting:
+            return
+        path = path or filedialog.askopenfilename(filetypes=[("Sort trace", "*.trc"),
+                                                             ("All files", "*")])
+        if not path:
+            return
+        try:
+            reader = TraceReader(path)
+        except (OSError, ValueError) as e:
+            print(f"Error: {e}")
+            return
+
+        if reader.algorithm in ALGORITHMS:
+            self.algorithm_var.set(reader.algorithm)
+            self.on_algorithm_change()
+        self.source = (reader.meta.get("distribution"), reader.meta.get("seed"))
+        self.state = SortState(reader.array)
+        self.heatmap_overlay.clear()
+        self.start_sort(reader.steps(), reader.algorithm, trace=reader)
+
+    def open_race(self):
+        if self.sorting:
+            return
+        if self.race_window is not None:
+            self.race_window.window.lift()
+            return
+        self.race_window = RaceWindow(self)
+
+    def open_profile(self):
+        # One profile at a time; a new pick replaces the open one.
+        if self.profile_window is not None:
+            self.profile_window.close()
+        self.profile_window = ProfileWindow(self)
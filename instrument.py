@@ -0,0 +1,114 @@
+import csv
+
+from algorithms import COMPARE, SWAP, WRITE, AUX
+
+# Probes that watch a step stream. They only ever see the (op, a, b) events,
+# never the array, so a run that attaches none pays nothing for them. Steps
+# are handed over in batches (consume) because a Python call per step would
+# cost more than the bookkeeping itself.
+#
+# What is counted:
+#   comparisons  COMPARE events (each reads two elements)
+#   swaps        SWAP events (each reads and writes two elements)
+#   writes       WRITE events, i.e. single-element stores such as shifts and
+#                merge output; element stores in total are writes + 2 * swaps
+#   reads        element reads implied by the events: two per comparison and
+#                swap, one for the value each WRITE stores and one per element
+#                of a buffer an AUX event sets up. Reads no event stands for,
+#                such as a distribution sort's key scans, aren't counted.
+#   aux, peak_aux  auxiliary buffer elements in use now / at most (AUX events)
+
+
+class Counters:
+    fields = ("comparisons", "swaps", "writes", "reads", "peak_aux")
+    # Everything a snapshot needs to put the counters back.
+    state = fields + ("aux",)
+
+    def __init__(self):
+        self.comparisons = 0
+        self.swaps = 0
+        self.writes = 0
+        self.reads = 0
+        self.aux = 0
+        self.peak_aux = 0
+        # Filled in by whoever drives the sort: time spent inside the
+        # algorithm's generator, and time spent drawing it.
+        self.algorithm_ns = 0
+        self.render_ns = 0
+
+    def consume(self, steps):
+        # Tally opcodes, derive the rest after.
+        counts = [0] * 8
+        aux = self.aux
+        filled = 0
+        for op, a, b in steps:
+            counts[op] += 1
+            if op == AUX:
+                aux += a
+                self.peak_aux = max(self.peak_aux, aux)
+                if a > 0:
+                    filled += a
+        self.aux = aux
+        self.reads += filled
+        self.tally(counts)
+
+    def tally(self, counts, sign=1):
+        # Adds (or with sign=-1, takes back) per-opcode counts; AUX is
+        # handled by consume since the peak can't be taken back.
+        self.comparisons += sign * counts[COMPARE]
+        self.swaps += sign * counts[SWAP]
+        self.writes += sign * counts[WRITE]
+        self.reads += sign * (2 * (counts[COMPARE] + counts[SWAP]) + counts[WRITE])
+
+    def as_dict(self):
+        return {field: getattr(self, field) for field in self.fields}
+
+
+class Heatmap:
+    # Per-index access counts, for the canvas overlay and for export.
+
+    def __init__(self, n):
+        self.reads = [0] * n
+        self.writes = [0] * n
+
+    def consume(self, steps):
+        reads, writes = self.reads, self.writes
+        for op, a, b in steps:
+            if op == COMPARE:
+                reads[a] += 1
+                reads[b] += 1
+            elif op == SWAP:
+                reads[a] += 1
+                reads[b] += 1
+                writes[a] += 1
+                writes[b] += 1
+            elif op == WRITE:
+                writes[a] += 1
+
+    def column_totals(self, columns):
+        # Accesses per pixel column, binned the way ColumnRenderer bins
+        # elements (column c holds the indices i with i * columns // n == c).
+        n = len(self.reads)
+        totals = []
+        for column in range(columns):
+            lo = -(-column * n // columns)
+            hi = -(-(column + 1) * n // columns)
+            totals.append(sum(self.reads[lo:hi]) + sum(self.writes[lo:hi]))
+        return totals
+
+    def export(self, path):
+        with open(path, "w", newline="") as out:
+            writer = csv.writer(out)
+            writer.writerow(["index", "reads", "writes"])
+            writer.writerows(zip(range(len(self.reads)), self.reads, self.writes))
+
+
+class Instrumentation:
+    # Feeds one step stream to any number of probes.
+
+    def __init__(self, *probes):
+        self.probes = [probe for probe in probes if probe is not None]
+
+    def consume(self, steps):
+        for probe in self.probes:
+            probe.consume(steps)
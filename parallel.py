@@ -0,0 +1,259 @@
+import argparse
+import heapq
+import os
+import random
+import sys
+import time
+from array import array
+from bisect import bisect_left
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+from algorithms import WRITE, SORTED, SEGMENT, AUX
+from scheduler import as_ready
+
+# Below this many elements the process pool costs more than it saves.
+PARALLEL_MIN = 50_000
+ITEMSIZE = array('i').itemsize
+
+
+# Elements are shared with the workers as int32 in a SharedMemory block, so
+# only block names and index ranges cross the process boundary.
+
+def _share(values):
+    shm = shared_memory.SharedMemory(create=True, size=max(1, len(values) * ITEMSIZE))
+    with shm.buf[:len(values) * ITEMSIZE] as raw, raw.cast('i') as view:
+        view[:] = values if isinstance(values, array) else array('i', values)
+    return shm
+
+
+def _read(shm, n):
+    result = array('i')
+    with shm.buf[:n * ITEMSIZE] as raw:
+        result.frombytes(raw)
+    return result
+
+
+def _sort_chunk(name, n, lo, hi):
+    shm = shared_memory.SharedMemory(name=name)
+    try:
+        with shm.buf[:n * ITEMSIZE] as raw, raw.cast('i') as view:
+            view[lo:hi] = array('i', sorted(view[lo:hi]))
+    finally:
+        shm.close()
+    return lo, hi
+
+
+def _merge_bucket(in_name, out_name, n, ranges, offset):
+    # One sample-sort bucket: the slices of every sorted chunk that fall
+    # between two splitters, merged into their final place in the output.
+    shm_in = shared_memory.SharedMemory(name=in_name)
+    shm_out = shared_memory.SharedMemory(name=out_name)
+    try:
+        with shm_in.buf[:n * ITEMSIZE] as raw_in, raw_in.cast('i') as view_in, \
+                shm_out.buf[:n * ITEMSIZE] as raw_out, raw_out.cast('i') as view_out:
+            merged = array('i', heapq.merge(*(view_in[lo:hi] for lo, hi in ranges)))
+            view_out[offset:offset + len(merged)] = merged
+    finally:
+        shm_in.close()
+        shm_out.close()
+    return offset, offset + len(merged)
+
+
+def chunk_bounds(n, chunks):
+    return [(k * n // chunks, (k + 1) * n // chunks) for k in range(chunks)]
+
+
+def splitters(values, buckets, oversample=32, seed=0):
+    # Pick buckets - 1 splitters from a sorted random sample, so buckets come
+    # out roughly equal in size whatever the input distribution.
+    if buckets < 2 or not values:
+        return []
+    sample = sorted(random.Random(seed).choices(values, k=buckets * oversample))
+    return [sample[k * len(sample) // buckets] for k in range(1, buckets)]
+
+
+def bucket_ranges(view, bounds, keys):
+    # For each sorted chunk, where each bucket starts and ends in it.
+    ranges = [[] for _ in range(len(keys) + 1)]
+    for lo, hi in bounds:
+        cuts = [lo] + [bisect_left(view, key, lo, hi) for key in keys] + [hi]
+        for bucket in range(len(keys) + 1):
+            if cuts[bucket] < cuts[bucket + 1]:
+                ranges[bucket].append((cuts[bucket], cuts[bucket + 1]))
+    return ranges
+
+
+def sort_chunks(shm, n, bounds, pool, poll=False):
+    # Sorts every chunk in place (in the pool if there is one) and yields
+    # chunk bounds as they finish; with poll=True, None while waiting.
+    if pool is None:
+        for lo, hi in bounds:
+            yield _sort_chunk(shm.name, n, lo, hi)
+        return
+
+    futures = [pool.submit(_sort_chunk, shm.name, n, lo, hi) for lo, hi in bounds]
+    for future in as_ready(futures, poll):
+        yield None if future is None else future.result()
+
+
+def parallel_sort(values, workers=None, method="merge"):
+    # Plain (non-visualized) entry point: returns a sorted array('i').
+    n = len(values)
+    workers = workers or os.cpu_count() or 1
+    if n < PARALLEL_MIN or workers == 1:
+        return array('i', sorted(values))
+
+    shm = _share(values)
+    out = None
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            bounds = chunk_bounds(n, workers)
+            for _ in sort_chunks(shm, n, bounds, pool):
+                pass
+
+            if method == "merge":
+                with shm.buf[:n * ITEMSIZE] as raw, raw.cast('i') as view:
+                    return array('i', heapq.merge(*(view[lo:hi] for lo, hi in bounds)))
+
+            out = shared_memory.SharedMemory(create=True, size=n * ITEMSIZE)
+            with shm.buf[:n * ITEMSIZE] as raw, raw.cast('i') as view:
+                ranges = bucket_ranges(view, bounds, splitters(values, workers))
+            futures, offset = [], 0
+            for bucket in ranges:
+                futures.append(pool.submit(_merge_bucket, shm.name, out.name, n, bucket, offset))
+                offset += sum(hi - lo for lo, hi in bucket)
+            for future in futures:
+                future.result()
+            return _read(out, n)
+    finally:
+        for block in (shm, out):
+            if block is not None:
+                block.close()
+                block.unlink()
+
+
+def parallel_merge_sort_steps(values, workers=None, poll=False):
+    yield from _parallel_steps(values, workers, "merge", poll)
+
+
+def sample_sort_steps(values, workers=None, poll=False):
+    yield from _parallel_steps(values, workers, "sample", poll)
+
+
+def _parallel_steps(values, workers, method, poll=False):
+    # Visualized version of parallel_sort. Each worker's chunk is tagged as a
+    # SEGMENT and written back as soon as that worker finishes; the k-way
+    # merge (or the bucket exchange) then writes the final order. Small
+    # arrays still show the chunks but sort them in this process. With
+    # poll=True it yields None while the pool is busy (see scheduler.py).
+    n = len(values)
+    workers = workers or os.cpu_count() or 1
+    chunks = max(2, workers) if n >= 2 else 1
+    bounds = chunk_bounds(n, chunks)
+
+    yield SEGMENT, 0, 0
+    for lo, hi in bounds:
+        yield SEGMENT, lo, hi
+
+    shm = _share(values)
+    try:
+        pool = None
+        if n >= PARALLEL_MIN and workers > 1:
+            pool = ProcessPoolExecutor(max_workers=workers)
+        try:
+            with shm.buf[:n * ITEMSIZE] as raw, raw.cast('i') as view:
+                for chunk in sort_chunks(shm, n, bounds, pool, poll):
+                    if chunk is None:
+                        yield None
+                        continue
+                    lo, hi = chunk
+                    for k in range(lo, hi):
+                        values[k] = view[k]
+                        yield WRITE, k, view[k]
+        finally:
+            if pool is not None:
+                pool.shutdown(cancel_futures=True)
+    finally:
+        shm.close()
+        shm.unlink()
+
+    # The merge overwrites `values`, so it reads from a snapshot of the
+    # sorted chunks.
+    yield SEGMENT, 0, 0
+    snapshot = list(values)
+    yield AUX, n, 0
+
+    if method == "merge":
+        for k, value in enumerate(heapq.merge(*(snapshot[lo:hi] for lo, hi in bounds))):
+            values[k] = value
+            yield WRITE, k, value
+    else:
+        offset = 0
+        for bucket in bucket_ranges(snapshot, bounds, splitters(snapshot, chunks)):
+            size = sum(hi - lo for lo, hi in bucket)
+            if size:
+                yield SEGMENT, offset, offset + size
+            for value in heapq.merge(*(snapshot[lo:hi] for lo, hi in bucket)):
+                values[offset] = value
+                yield WRITE, offset, value
+                offset += 1
+        yield SEGMENT, 0, 0
+
+    yield AUX, -n, 0
+    yield SORTED, 0, n
+
+
+def parse_workers(text):
+    try:
+        return [int(w) for w in text.split(',') if w]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"bad worker list {text!r}")
+
+
+def main(argv=None):
+    from bench import parse_sizes, write_report
+    from distributions import generate
+
+    cores = os.cpu_count() or 1
+    default_workers = sorted({1, *(2 ** k for k in range(cores.bit_length()) if 2 ** k <= cores), cores})
+
+    parser = argparse.ArgumentParser(
+        prog="sorting-visualizer.py parallel",
+        description="Time the process-pool sorts against their own one-worker "
+                    "(serial) run and report the speedup per worker count.")
+    parser.add_argument("-n", "--sizes", type=parse_sizes, default=[1_000_000])
+    parser.add_argument("-w", "--workers", type=parse_workers, default=default_workers,
+                        help="comma-separated worker counts; speedup is relative to the "
+                             f"first one (default: {','.join(map(str, default_workers))})")
+    parser.add_argument("-m", "--methods", default="merge,sample",
+                        help="comma-separated: merge (k-way heap merge), sample (sample sort)")
+    parser.add_argument("-s", "--seed", type=int, default=0)
+    parser.add_argument("-f", "--format", choices=["json", "csv"], default="json")
+    parser.add_argument("-o", "--output")
+    args = parser.parse_args(argv)
+
+    fields = ["method", "n", "workers", "cores", "seconds", "speedup"]
+    results = []
+    for n in args.sizes:
+        data = generate("Uniform", n, args.seed, "array")
+        expected = sorted(data)
+        for method in args.methods.split(','):
+            if method not in ("merge", "sample"):
+                parser.error(f"unknown method {method!r}")
+            baseline = None
+            for workers in args.workers:
+                start = time.perf_counter()
+                result = parallel_sort(data, workers, method)
+                seconds = time.perf_counter() - start
+                if list(result) != expected:
+                    raise RuntimeError(f"{method} sort with {workers} workers gave a wrong result")
+
+                baseline = baseline or seconds
+                results.append({"method": method, "n": n, "workers": workers, "cores": cores,
+                                "seconds": round(seconds, 6),
+                                "speedup": round(baseline / seconds, 2)})
+                print(f"{method} n={n} workers={workers}: {seconds:.3f}s", file=sys.stderr)
+
+    write_report(results, fields, args.format, args.output)
+    return 0
@@ -0,0 +1,261 @@
+from array import array
+from operator import itemgetter
+
+from algorithms import COMPARE, SWAP, WRITE, SORTED, PIVOT, SEGMENT
+from instrument import Counters, Heatmap, Instrumentation
+from theme import COLORS
+
+# Marking more than this many bars in one step redraws the whole canvas
+# instead of tracking every index as dirty.
+FULL_REDRAW_RANGE = 4096
+# Timeline checkpoints are at least this many steps apart (more for big
+# arrays), and the timeline keeps at most TIMELINE_LIMIT steps.
+CHECKPOINT_MIN = 1024
+TIMELINE_LIMIT = 4_000_000
+
+
+class SortState:
+    # What the GUI knows about one sort, rebuilt purely from its step events:
+    # a mirror of the array, the sorted/segment masks and the instrumentation
+    # probes (operation counters and, optionally, the access heatmap).
+    # `typecode` is how snapshots and the timeline store element values:
+    # 'i' (int32), or 'q' for int64 data such as an external sort's view.
+    # `bounds` is a (min, max) the values may reach beyond those in `array`,
+    # as with a view that samples a larger file.
+
+    def __init__(self, array, heatmap=False, typecode='i', bounds=None):
+        self.array = list(array)
+        self.typecode = typecode
+        self.bounds = bounds
+        self.original = list(array)
+        self.counters = Counters()
+        self.heatmap = Heatmap(len(self.array)) if heatmap else None
+        self.instruments = Instrumentation(self.counters, self.heatmap)
+        self.pivot = -1
+        self.redraw_all = False
+        self.clear_masks()
+
+    def clear_masks(self):
+        self.sorted_mask = bytearray(len(self.array))
+        self.segment_mask = bytearray(len(self.array))
+        self.segment_count = 0
+
+    def apply_all(self, steps, dirty):
+        # Returns the highlights of the last step.
+        self.instruments.consume(steps)
+        for step in steps:
+            self.apply(step, dirty)
+        return self.highlight(steps[-1]) if steps else {}
+
+    def apply(self, step, dirty):
+        # Adds the indices whose bars may have changed to `dirty`. Not seen
+        # by the probes; go through apply_all for that.
+        op, a, b = step
+
+        if op == COMPARE:
+            return
+        if op == SWAP:
+            self.array[a], self.array[b] = self.array[b], self.array[a]
+            dirty.update((a, b))
+        elif op == WRITE:
+            self.array[a] = b
+            dirty.add(a)
+        elif op == SORTED:
+            self.sorted_mask[a:b] = b'\x01' * (b - a)
+            self.mark_dirty(dirty, a, b)
+        elif op == PIVOT:
+            self.pivot = a
+        elif op == SEGMENT:
+            if a == b == 0:
+                self.segment_mask = bytearray(len(self.array))
+                self.segment_count = 0
+                self.redraw_all = True
+            elif a < b:
+                self.segment_count += 1
+                self.segment_mask[a:b] = bytes([(self.segment_count - 1) % 255 + 1]) * (b - a)
+                self.mark_dirty(dirty, a, b)
+
+    def highlight(self, step):
+        # The colours that show `step` happening.
+        op, a, b = step
+        if op == COMPARE:
+            return {a: COLORS['compare'], b: COLORS['compare']}
+        if op == SWAP:
+            return {a: COLORS['swap'], b: COLORS['swap']}
+        if op == WRITE:
+            return {a: COLORS['swap']}
+        return {}
+
+    def snapshot(self):
+        return (array(self.typecode, self.array), bytes(self.sorted_mask), bytes(self.segment_mask),
+                self.segment_count, self.pivot,
+                [getattr(self.counters, field) for field in Counters.state])
+
+    def restore(self, snapshot):
+        values, sorted_mask, segment_mask, self.segment_count, self.pivot, counts = snapshot
+        self.array[:] = values
+        self.sorted_mask = bytearray(sorted_mask)
+        self.segment_mask = bytearray(segment_mask)
+        for field, value in zip(Counters.state, counts):
+            setattr(self.counters, field, value)
+        self.redraw_all = True
+
+    def mark_dirty(self, dirty, lo, hi):
+        if hi - lo > FULL_REDRAW_RANGE:
+            self.redraw_all = True
+        else:
+            dirty.update(range(lo, hi))
+
+    def frame_colors(self, highlights):
+        colors = {self.pivot: COLORS['pivot']} if self.pivot >= 0 else {}
+        colors.update(highlights)
+        return colors
+
+    def take_dirty(self, dirty):
+        # None asks the renderer to redraw everything.
+        if self.redraw_all:
+            self.redraw_all = False
+            return None
+        return dirty
+
+
+class Timeline:
+    # Every step played so far, so any earlier point can be shown again.
+    # Steps are kept as a compact reversible log in typed arrays (op, a, b,
+    # plus the value each WRITE overwrote: 9 to 13 bytes a step), with a full
+    # SortState snapshot every `interval` steps. Reaching any step costs at
+    # most `interval` steps of work: undo SWAPs and WRITEs backwards, or
+    # restore the checkpoint before the target and replay forwards,
+    # whichever is shorter. The interval grows with the array so the
+    # checkpoints cost about as much memory as the log; past `limit` steps
+    # the oldest half of the log is dropped.
+
+    def __init__(self, state, interval=None, limit=TIMELINE_LIMIT):
+        self.interval = interval or max(CHECKPOINT_MIN, len(state.array))
+        self.limit = limit
+        self.ops = array('b')
+        self.a = array('i')
+        self.b = array(state.typecode)  # holds WRITE values
+        self.old = array(state.typecode)  # one entry per WRITE, not per step
+        self.start = 0
+        self.position = 0
+        # WRITEs before `position`, counted from step 0 like the positions
+        # (`dropped` of them were trimmed from `old`), so undo finds its
+        # entries in `old` without rescanning the log.
+        self.writes = 0
+        self.dropped = 0
+        # Each checkpoint is (snapshot, writes before it).
+        self.checkpoints = {0: (state.snapshot(), 0)}
+
+    @property
+    def end(self):
+        return self.start + len(self.ops)
+
+    def record(self, steps, state, dirty):
+        # Plays new steps on `state`, which must be at the end of the
+        # timeline, and logs them. Returns the highlights of the last one.
+        highlights = state.highlight(steps[-1]) if steps else {}
+        values, old = state.array, self.old
+        while steps:
+            # Split the batch where the next checkpoint falls, so the
+            # snapshot's counters match its array.
+            room = self.interval - self.position % self.interval
+            chunk, steps = steps[:room], steps[room:]
+            state.instruments.consume(chunk)
+            for step in chunk:
+                if step[0] == WRITE:
+                    old.append(values[step[1]])
+                state.apply(step, dirty)
+
+            self.ops.extend(map(itemgetter(0), chunk))
+            self.a.extend(map(itemgetter(1), chunk))
+            self.b.extend(map(itemgetter(2), chunk))
+            self.position += len(chunk)
+            self.writes = self.dropped + len(old)
+            if self.position % self.interval == 0:
+                self.checkpoints[self.position] = (state.snapshot(), self.writes)
+
+        if len(self.ops) > self.limit:
+            self.trim()
+        return highlights
+
+    def trim(self):
+        # Drop the oldest half, up to a checkpoint so the rest stays reachable.
+        cut = (self.start + len(self.ops) // 2) // self.interval * self.interval
+        drop = cut - self.start
+        writes = self.ops[:drop].count(WRITE)
+        del self.old[:writes]
+        self.dropped += writes
+        for log in (self.ops, self.a, self.b):
+            del log[:drop]
+        self.checkpoints = {step: snapshot for step, snapshot in self.checkpoints.items()
+                            if step >= cut}
+        self.start = cut
+
+    def steps(self, lo, hi):
+        lo -= self.start
+        hi -= self.start
+        return list(zip(self.ops[lo:hi], self.a[lo:hi], self.b[lo:hi]))
+
+    def last_step(self):
+        if self.position > self.start:
+            return self.steps(self.position - 1, self.position)[0]
+        return None
+
+    def forward(self, state, count, dirty):
+        # Replays logged steps. Only the counters see them again; the
+        # heatmap already counted them the first time.
+        steps = self.steps(self.position, min(self.position + count, self.end))
+        state.counters.consume(steps)
+        for step in steps:
+            if step[0] == WRITE:
+                self.writes += 1
+            state.apply(step, dirty)
+        self.position += len(steps)
+        return state.highlight(steps[-1]) if steps else {}
+
+    def seek(self, state, target):
+        # Moves `state` to just after step `target` (0 = the input array).
+        target = max(self.start, min(target, self.end))
+        base = target // self.interval * self.interval
+        dirty = set()
+
+        if target >= self.position and target - self.position <= target - base:
+            self.forward(state, target - self.position, dirty)
+        elif target < self.position and self.position - target <= target - base \
+                and self.undo(state, target, dirty):
+            pass
+        else:
+            snapshot, self.writes = self.checkpoints[base]
+            state.restore(snapshot)
+            self.position = base
+            self.forward(state, target - base, dirty)
+        state.redraw_all = True
+
+    def undo(self, state, target, dirty):
+        # Walks the log backwards. Only COMPARE, SWAP and WRITE can be taken
+        # back step by step; anything else in the way falls back to a
+        # checkpoint.
+        lo, hi = target - self.start, self.position - self.start
+        ops = self.ops[lo:hi]
+        if not set(ops) <= {COMPARE, SWAP, WRITE}:
+            return False
+
+        values = state.array
+        writes = self.writes - self.dropped
+        for k in range(hi - 1, lo - 1, -1):
+            op, a = self.ops[k], self.a[k]
+            if op == SWAP:
+                b = self.b[k]
+                values[a], values[b] = values[b], values[a]
+            elif op == WRITE:
+                writes -= 1
+                values[a] = self.old[writes]
+
+        counts = [0] * 8
+        for op in ops:
+            counts[op] += 1
+        state.counters.tally(counts, -1)
+        self.writes -= counts[WRITE]
+        self.position = target
+        return True
@@ -0,0 +1,12 @@
+# Drop-in algorithms. Every module here that defines ALGORITHMS, a list of
+# registry.Algorithm entries, is added to the catalogue (see registry.py):
+#
+#     from registry import Algorithm
+#
+#     ALGORITHMS = [
+#         Algorithm("Gnome Sort", "plugins._gnome:gnome_sort",
+#                   ("O(n)", "O(n²)", "O(n²)", "O(1)"), stable=True, in_place=True),
+#     ]
+#
+# Modules named with a leading underscore are not scanned: put the
+# implementation there and it is only imported when the sort is run.
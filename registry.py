@@ -0,0 +1,207 @@
+import importlib
+import pkgutil
+import sys
+from collections.abc import Mapping
+from importlib.metadata import entry_points
+
+# Every algorithm the app and the headless tools can run, by display name.
+# An entry is only metadata plus a "module:function" path to its step
+# generator (see algorithms.py for the step events), and the module is
+# imported the first time the algorithm is actually run. Besides the
+# built-ins below, algorithms are discovered on first use from:
+#
+#   - modules in the `plugins` package that define ALGORITHMS, a list of
+#     Algorithm entries (modules named _* are skipped)
+#   - installed packages advertising an ENTRY_POINT_GROUP entry point
+#     that loads to an Algorithm or a list of them
+#
+# Either way the declaring module should stay cheap to import and point at
+# the implementation by path, so listing the catalogue never loads a sort.
+ENTRY_POINT_GROUP = "sorting_visualizer.algorithms"
+PLUGIN_PACKAGE = "plugins"
+UNKNOWN = ("?", "?", "?", "?")
+
+
+class Algorithm:
+    def __init__(self, name, target, complexity=UNKNOWN, stable=False, in_place=False,
+                 parallel=False, integer_keys=False, vectorized=None, partial=None,
+                 baseline=None):
+        # `complexity` is (best, average, worst, extra space). `target` and
+        # `vectorized` (a NumPy version that sorts an ndarray in place, see
+        # vectorized.py) are "module:function" paths or the functions.
+        # Selection algorithms take a `k` and only finish array[:k]: it ends
+        # up holding the k smallest, in order if `partial` is "sort", or with
+        # the k-th smallest at k - 1 if it is "select". `baseline` names the
+        # full sort they are measured against.
+        self.name = name
+        self.target = target
+        self.complexity = complexity
+        self.stable = stable
+        self.in_place = in_place
+        self.parallel = parallel
+        self.integer_keys = integer_keys
+        self.vectorized = vectorized
+        self.partial = partial
+        self.baseline = baseline
+
+    def load(self):
+        self.target = resolve(self.target)
+        return self.target
+
+    def load_vectorized(self):
+        if self.vectorized is not None:
+            self.vectorized = resolve(self.vectorized)
+        return self.vectorized
+
+    @property
+    def capabilities(self):
+        flags = [("stable", self.stable), ("in-place", self.in_place),
+                 ("parallel", self.parallel), ("integer keys", self.integer_keys),
+                 ("top-k", self.partial == "sort"), ("selection", self.partial == "select")]
+        return [flag for flag, on in flags if on]
+
+    def selected(self, n, k=None):
+        # How much of an n-element array a run leaves finished.
+        if not self.partial:
+            return n
+        from algorithms import select_k
+        return select_k(n, k)
+
+    def verify(self, values, original, k=None):
+        from storage import verify, verify_selection
+
+        if not self.partial:
+            verify(values, original)
+        else:
+            verify_selection(values, original, self.selected(len(values), k),
+                             ordered=self.partial == "sort")
+
+
+def resolve(target):
+    if not isinstance(target, str):
+        return target
+    module, _, function = target.partition(":")
+    return getattr(importlib.import_module(module), function)
+
+
+class Registry(Mapping):
+    # Maps names to step generators, loading each on lookup, so existing
+    # `ALGORITHMS[name](array)` callers are unchanged; iterating (names) and
+    # `in` never load a sort. spec() gives the metadata.
+
+    def __init__(self, algorithms=(), plugin_package=PLUGIN_PACKAGE, group=ENTRY_POINT_GROUP):
+        self.algorithms = {}
+        self.plugin_package = plugin_package
+        self.group = group
+        self.discovered = False
+        for algorithm in algorithms:
+            self.register(algorithm)
+
+    def register(self, algorithm):
+        if algorithm.name in self.algorithms:
+            raise ValueError(f"algorithm {algorithm.name!r} is already registered")
+        self.algorithms[algorithm.name] = algorithm
+
+    def discover(self):
+        # Plugins are looked for once, the first time the catalogue is read.
+        if self.discovered:
+            return
+        self.discovered = True
+        for source, declared in self.plugins():
+            for algorithm in declared if isinstance(declared, (list, tuple)) else [declared]:
+                try:
+                    self.register(algorithm)
+                except ValueError as e:
+                    print(f"Error: plugin {source}: {e}", file=sys.stderr)
+
+    def plugins(self):
+        # (where from, what it declared), skipping any that fail to import.
+        if self.plugin_package:
+            try:
+                package = importlib.import_module(self.plugin_package)
+            except ImportError:
+                package = None
+            for info in pkgutil.iter_modules(getattr(package, "__path__", [])):
+                if info.name.startswith("_"):
+                    continue  # implementation modules, imported on use
+                name = f"{self.plugin_package}.{info.name}"
+                try:
+                    yield name, getattr(importlib.import_module(name), "ALGORITHMS", [])
+                except Exception as e:
+                    print(f"Error: plugin {name}: {e}", file=sys.stderr)
+
+        if self.group:
+            for entry_point in entry_points(group=self.group):
+                try:
+                    yield entry_point.value, entry_point.load()
+                except Exception as e:
+                    print(f"Error: plugin {entry_point.value}: {e}", file=sys.stderr)
+
+    def spec(self, name):
+        self.discover()
+        return self.algorithms[name]
+
+    def __getitem__(self, name):
+        return self.spec(name).load()
+
+    def __contains__(self, name):
+        self.discover()
+        return name in self.algorithms
+
+    def __iter__(self):
+        self.discover()
+        return iter(self.algorithms)
+
+    def __len__(self):
+        self.discover()
+        return len(self.algorithms)
+
+
+ALGORITHMS = Registry([
+    Algorithm("Bubble Sort", "algorithms:bubble_sort",
+              ("O(n)", "O(n²)", "O(n²)", "O(1)"), stable=True, in_place=True),
+    Algorithm("Selection Sort", "algorithms:selection_sort",
+              ("O(n²)", "O(n²)", "O(n²)", "O(1)"), in_place=True),
+    Algorithm("Insertion Sort", "algorithms:insertion_sort",
+              ("O(n)", "O(n²)", "O(n²)", "O(1)"), stable=True, in_place=True),
+    Algorithm("Merge Sort", "algorithms:merge_sort",
+              ("O(n log n)", "O(n log n)", "O(n log n)", "O(n)"), stable=True),
+    Algorithm("Bottom-Up Merge Sort", "algorithms:bottom_up_merge_sort",
+              ("O(n log n)", "O(n log n)", "O(n log n)", "O(n)"), stable=True),
+    Algorithm("Quick Sort", "algorithms:quick_sort",
+              ("O(n)", "O(n log n)", "O(n²)", "O(log n)"), in_place=True),
+    Algorithm("Heap Sort", "algorithms:heap_sort",
+              ("O(n log n)", "O(n log n)", "O(n log n)", "O(1)"), in_place=True),
+    Algorithm("Shell Sort", "algorithms:shell_sort",
+              ("O(n log n)", "~O(n^1.3)", "O(n^1.5)", "O(1)"), in_place=True),
+    Algorithm("Tim Sort", "algorithms:tim_sort",
+              ("O(n)", "O(n log n)", "O(n log n)", "O(n)"), stable=True),
+    Algorithm("Counting Sort", "algorithms:counting_sort",
+              ("O(n + k)", "O(n + k)", "O(n + k)", "O(k)"), stable=True, integer_keys=True,
+              vectorized="vectorized:counting_sort_np"),
+    Algorithm("LSD Radix Sort", "algorithms:lsd_radix_sort",
+              ("O(d(n + b))", "O(d(n + b))", "O(d(n + b))", "O(n + b)"), stable=True,
+              integer_keys=True, vectorized="vectorized:lsd_radix_sort_np"),
+    Algorithm("MSD Radix Sort", "algorithms:msd_radix_sort",
+              ("O(n)", "O(d(n + b))", "O(d(n + b))", "O(n + b)"), stable=True,
+              integer_keys=True, vectorized="vectorized:msd_radix_sort_np"),
+    Algorithm("Bucket Sort", "algorithms:bucket_sort",
+              ("O(n)", "O(n√n)", "O(n²)", "O(n)"), stable=True,
+              vectorized="vectorized:bucket_sort_np"),
+    # Chunks go through int32 shared memory, hence integer keys.
+    Algorithm("Parallel Merge Sort", "parallel:parallel_merge_sort_steps",
+              ("O(n log n / p)", "O(n log n / p + n log p)", "O(n log n / p + n log p)", "O(n)"),
+              stable=True, parallel=True, integer_keys=True),
+    Algorithm("Parallel Sample Sort", "parallel:sample_sort_steps",
+              ("O(n log n / p)", "O(n log n / p)", "O(n log n)", "O(n)"),
+              parallel=True, integer_keys=True),
+    Algorithm("Quickselect", "algorithms:quickselect",
+              ("O(n)", "O(n)", "O(n)", "O(log n)"), in_place=True, partial="select",
+              baseline="Quick Sort"),
+    Algorithm("Partial Heap Sort", "algorithms:partial_heap_sort",
+              ("O(n + k log k)", "O(n log k)", "O(n log k)", "O(1)"), in_place=True,
+              partial="sort", baseline="Heap Sort"),
+    Algorithm("Partial Quick Sort", "algorithms:partial_quick_sort",
+              ("O(n)", "O(n + k log k)", "O(n²)", "O(log n)"), in_place=True, partial="sort",
+              baseline="Quick Sort"),
+])
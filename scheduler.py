@@ -0,0 +1,130 @@
+import inspect
+import time
+from concurrent.futures import as_completed
+
+from registry import ALGORITHMS
+
+# How long one take() may spend inside a generator, so a sort whose steps
+# are far apart can't hold up the main loop for long.
+TIME_SLICE_NS = 20_000_000
+
+# Cooperative scheduling of sorts on one thread, the GUI's main loop. A sort
+# is just its step generator: it runs only while someone pulls steps from
+# it, so pausing it is simply not pulling, and it resumes exactly where it
+# stopped. A generator that waits on something outside this thread (a
+# process pool) yields None while it isn't ready, instead of blocking the
+# loop; consumers that don't mind blocking ask it not to (poll=False).
+
+
+def sort_steps(algorithm, array, **params):
+    # The algorithm's step generator, asked to yield None rather than block
+    # if it can wait on a worker pool (unless poll=False). Parameters it
+    # doesn't take (e.g. `k` for a full sort), or that are None, are dropped.
+    sort = ALGORITHMS[algorithm]
+    accepted = inspect.signature(sort).parameters
+    params = {key: val for key, val in dict({"poll": True}, **params).items()
+              if key in accepted and val is not None}
+    return sort(array, **params)
+
+
+class SortTask:
+    # One sort being played. Time spent inside the generator is added to
+    # `counters.algorithm_ns` when counters are given.
+
+    def __init__(self, steps, name="", counters=None):
+        self.steps = steps
+        self.name = name
+        self.counters = counters
+        self.done = False
+        self.failed = False
+
+    def take(self, count, time_slice=TIME_SLICE_NS):
+        # Up to `count` steps: fewer at the end, when the generator says it
+        # isn't ready yet, or once `time_slice` ns have been spent in it.
+        batch = []
+        if self.done or count < 1:
+            return batch
+        start = time.perf_counter_ns()
+        deadline = start + time_slice
+        try:
+            for step in self.steps:
+                if step is None:
+                    break
+                batch.append(step)
+                if len(batch) >= count:
+                    break
+                if not len(batch) & 63 and time.perf_counter_ns() > deadline:
+                    break
+            else:
+                self.done = True
+        except Exception as e:
+            print(f"Error: {self.name}: {e}")
+            self.done = self.failed = True
+        if self.counters is not None:
+            self.counters.algorithm_ns += time.perf_counter_ns() - start
+        return batch
+
+    def close(self):
+        # Runs the generator's own cleanup (pools, temp files) now.
+        self.steps.close()
+        self.done = True
+
+
+class Scheduler:
+    # Calls every active client from one shared timer on the main loop
+    # (`after` / `cancel` are e.g. Tk's). A client is a callable that
+    # returns False once it has nothing more to do; when no client is left
+    # the timer is not rearmed, so an idle or paused app uses no CPU.
+
+    def __init__(self, after, cancel, interval):
+        self.after = after
+        self.cancel = cancel
+        self.interval = interval
+        self.clients = []
+        self.timer = None
+
+    def add(self, client):
+        if client not in self.clients:
+            self.clients.append(client)
+        if self.timer is None:
+            self.timer = self.after(self.interval, self.run)
+
+    def remove(self, client):
+        if client in self.clients:
+            self.clients.remove(client)
+        if not self.clients and self.timer is not None:
+            self.cancel(self.timer)
+            self.timer = None
+
+    def run(self):
+        self.timer = None
+        # Clients may add or remove clients while they run. One that raises
+        # is dropped, so it can't stop the timer for the rest.
+        for client in list(self.clients):
+            if client not in self.clients:
+                continue
+            try:
+                keep = client()
+            except Exception as e:
+                print(f"Error: {e}")
+                keep = False
+            if not keep:
+                self.remove(client)
+        if self.clients and self.timer is None:
+            self.timer = self.after(self.interval, self.run)
+
+
+def as_ready(futures, poll=False):
+    # Like concurrent.futures.as_completed, but with poll=True it yields
+    # None instead of blocking whenever none of the rest has finished.
+    if not poll:
+        yield from as_completed(futures)
+        return
+    pending = list(futures)
+    while pending:
+        done = [future for future in pending if future.done()]
+        if not done:
+            yield None
+        for future in done:
+            pending.remove(future)
+            yield future
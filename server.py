@@ -0,0 +1,441 @@
+import argparse
+import asyncio
+import base64
+import hashlib
+import json
+import random
+import struct
+import sys
+
+from distributions import DISTRIBUTIONS, generate
+from playback import SortState
+from registry import ALGORITHMS
+from scheduler import SortTask, sort_steps
+from theme import COLORS, segment_color
+
+# Streams a sort to web browsers: one run on the server, any number of
+# viewers. Every frame the run's changes (index, value, colour code) are
+# merged into each viewer's pending delta, and a viewer's writer sends
+# whatever has piled up once its socket has drained. A slow viewer so gets
+# fewer, bigger frames instead of a growing queue, and past HALF_FULL the
+# delta is replaced by a full snapshot. Plain asyncio streams: a minimal
+# HTTP server for the page and RFC 6455 WebSocket framing for the stream.
+FPS = 30
+MAX_SIZE = 100_000
+LOOP_PAUSE = 3.0
+HALF_FULL = 0.5
+MAX_MESSAGE = 1 << 16
+WS_GUID = b"258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+TEXT, CLOSE, PING, PONG = 0x1, 0x8, 0x9, 0xA
+
+# Colour codes sent per element; the page gets the table once per snapshot.
+PALETTE = [COLORS['bar'], COLORS['compare'], COLORS['swap'], COLORS['sorted'], COLORS['pivot'],
+           *COLORS['segments']]
+CODES = {}
+for code, color in enumerate(PALETTE):
+    CODES.setdefault(color, code)
+
+
+class Broadcast:
+    # The one sort every viewer watches, played on the event loop.
+
+    def __init__(self, algorithm, distribution, n, seed, speed, loop=False, k=None, params=None):
+        self.algorithm = algorithm
+        self.k = k
+        self.distribution = distribution
+        # Distribution knobs (see bench.distribution_params).
+        self.params = params or {}
+        self.n = n
+        self.seed = seed
+        self.speed = speed
+        self.loop = loop
+        self.viewers = set()
+        self.watched = asyncio.Event()
+        self.reset()
+
+    def reset(self):
+        seed = self.seed if self.seed is not None else random.randrange(2 ** 32)
+        self.state = SortState(generate(self.distribution, self.n, seed, **self.params))
+        self.task = SortTask(sort_steps(self.algorithm, list(self.state.array), k=self.k), self.algorithm,
+                             self.state.counters)
+        self.colors = {}
+        self.step_count = 0
+        self.done = False
+        self.push(None)
+
+    async def run(self):
+        # Nothing is sorted until the first viewer arrives.
+        await self.watched.wait()
+        budget = 0.0
+        while True:
+            while not self.task.done:
+                await asyncio.sleep(1 / FPS)
+                budget += self.speed / FPS
+                steps = self.task.take(int(budget))
+                budget -= len(steps)
+                if not steps:
+                    budget = min(budget, 1)
+                dirty = set()
+                highlights = self.state.apply_all(steps, dirty)
+                self.step_count += len(steps)
+                self.publish(dirty, highlights)
+            self.finish()
+            if not self.loop:
+                return
+            await asyncio.sleep(LOOP_PAUSE)
+            if self.seed is not None:
+                self.seed += 1
+            self.reset()
+
+    def finish(self):
+        # A selection algorithm only finishes the k smallest; its k-th
+        # smallest stays in the pivot colour.
+        spec = ALGORITHMS.spec(self.algorithm)
+        k = spec.selected(len(self.state.array), self.k)
+        try:
+            spec.verify(self.state.array, self.state.original, self.k)
+        except RuntimeError as e:
+            print(f"Error: {self.algorithm}: {e}", file=sys.stderr)
+        self.state.pivot = k - 1 if spec.partial == "select" and k else -1
+        self.state.clear_masks()
+        self.state.sorted_mask[:k] = b'\x01' * k
+        self.colors = self.state.frame_colors({})
+        self.done = True
+        self.push(None)
+
+    def publish(self, dirty, highlights):
+        colors = self.state.frame_colors(highlights)
+        dirty = self.state.take_dirty(dirty)
+        if dirty is None:
+            self.colors = colors
+            self.push(None)
+            return
+        # Last frame's highlights go back to their normal colour.
+        dirty.update(self.colors, colors)
+        self.colors = colors
+        array = self.state.array
+        self.push({i: (array[i], self.code(i)) for i in dirty})
+
+    def push(self, changes):
+        for viewer in self.viewers:
+            viewer.push(changes, self.n)
+
+    def code(self, i):
+        if i in self.colors:
+            return CODES[self.colors[i]]
+        if self.state.sorted_mask[i]:
+            return CODES[COLORS['sorted']]
+        if self.state.segment_mask[i]:
+            return CODES[segment_color(self.state.segment_mask[i])]
+        return 0
+
+    def stats(self):
+        counters = self.state.counters
+        return {"algorithm": self.algorithm, "distribution": self.distribution,
+                "step": self.step_count, "comparisons": counters.comparisons,
+                "swaps": counters.swaps, "writes": counters.writes,
+                "seconds": round(counters.algorithm_ns / 1e9, 6), "done": self.done,
+                "viewers": len(self.viewers)}
+
+    def snapshot(self):
+        array = self.state.array
+        return {"type": "full", "palette": PALETTE, "canvas": COLORS['canvas'],
+                "values": array, "colors": [self.code(i) for i in range(len(array))],
+                "stats": self.stats()}
+
+    def delta(self, changes):
+        indices = sorted(changes)
+        return {"type": "delta", "i": indices, "v": [changes[i][0] for i in indices],
+                "c": [changes[i][1] for i in indices], "stats": self.stats()}
+
+
+class Viewer:
+    # One browser. push() only merges; send() writes the merged frame when
+    # the previous one has left, so the frames a slow viewer can't take in
+    # time are dropped, their changes folded into the next one.
+
+    def __init__(self, writer):
+        self.writer = writer
+        self.changes = {}
+        self.full = True
+        self.wake = asyncio.Event()
+        self.wake.set()
+
+    def push(self, changes, n):
+        if changes is None or len(self.changes) + len(changes) > n * HALF_FULL:
+            self.full = True
+            self.changes = {}
+        elif not self.full:
+            self.changes.update(changes)
+        self.wake.set()
+
+    async def send(self, broadcast):
+        while True:
+            await self.wake.wait()
+            self.wake.clear()
+            if self.full:
+                message = broadcast.snapshot()
+                self.full = False
+            elif self.changes:
+                message = broadcast.delta(self.changes)
+            else:
+                message = {"type": "delta", "i": [], "v": [], "c": [], "stats": broadcast.stats()}
+            self.changes = {}
+            # drain() waits while the socket's buffer is full; that is what
+            # makes a slow viewer skip frames.
+            self.writer.write(encode_frame(TEXT, json.dumps(message, separators=(",", ":")).encode()))
+            await self.writer.drain()
+
+    async def receive(self, reader):
+        # Only control frames matter: answer pings, stop on close. Replies
+        # are small, so they are queued without waiting on drain(), which
+        # send() may be waiting on already.
+        while True:
+            opcode, payload = await read_frame(reader)
+            if opcode == CLOSE:
+                self.writer.write(encode_frame(CLOSE, payload[:2]))
+                return
+            if opcode == PING:
+                self.writer.write(encode_frame(PONG, payload))
+
+
+def encode_frame(opcode, payload):
+    # Server frames are never masked.
+    n = len(payload)
+    if n < 126:
+        header = struct.pack("!BB", 0x80 | opcode, n)
+    elif n < 1 << 16:
+        header = struct.pack("!BBH", 0x80 | opcode, 126, n)
+    else:
+        header = struct.pack("!BBQ", 0x80 | opcode, 127, n)
+    return header + payload
+
+
+async def read_frame(reader):
+    first, second = await reader.readexactly(2)
+    n = second & 0x7F
+    if n == 126:
+        n, = struct.unpack("!H", await reader.readexactly(2))
+    elif n == 127:
+        n, = struct.unpack("!Q", await reader.readexactly(8))
+    if n > MAX_MESSAGE:
+        raise ValueError(f"client message of {n:,} bytes is too long")
+    mask = await reader.readexactly(4) if second & 0x80 else bytes(4)
+    payload = await reader.readexactly(n)
+    return first & 0x0F, bytes(b ^ mask[k % 4] for k, b in enumerate(payload))
+
+
+class StreamServer:
+    def __init__(self, broadcast):
+        self.broadcast = broadcast
+
+    async def handle(self, reader, writer):
+        try:
+            request = await reader.readuntil(b"\r\n\r\n")
+            lines = request.decode("latin-1").split("\r\n")
+            method, path, _ = lines[0].split(" ", 2)
+            headers = {}
+            for line in lines[1:]:
+                name, _, value = line.partition(":")
+                headers[name.strip().lower()] = value.strip()
+
+            if method != "GET":
+                await respond(writer, "405 Method Not Allowed", "text/plain", b"GET only\n")
+            elif path == "/":
+                await respond(writer, "200 OK", "text/html; charset=utf-8", PAGE.encode())
+            elif path == "/ws" and headers.get("upgrade", "").lower() == "websocket":
+                await self.stream(reader, writer, headers.get("sec-websocket-key", ""))
+            else:
+                await respond(writer, "404 Not Found", "text/plain", b"not found\n")
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError,
+                ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def stream(self, reader, writer, key):
+        accept = base64.b64encode(hashlib.sha1(key.encode() + WS_GUID).digest()).decode()
+        writer.write(("HTTP/1.1 101 Switching Protocols\r\n"
+                      "Upgrade: websocket\r\n"
+                      "Connection: Upgrade\r\n"
+                      f"Sec-WebSocket-Accept: {accept}\r\n\r\n").encode())
+        await writer.drain()
+
+        viewer = Viewer(writer)
+        broadcast = self.broadcast
+        broadcast.viewers.add(viewer)
+        broadcast.watched.set()
+        tasks = [asyncio.ensure_future(viewer.send(broadcast)),
+                 asyncio.ensure_future(viewer.receive(reader))]
+        try:
+            done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            for task in pending:
+                task.cancel()
+            for task in done:
+                task.exception()  # a dropped connection is just a viewer leaving
+        finally:
+            broadcast.viewers.discard(viewer)
+
+
+async def respond(writer, status, content_type, body):
+    writer.write((f"HTTP/1.1 {status}\r\n"
+                  f"Content-Type: {content_type}\r\n"
+                  f"Content-Length: {len(body)}\r\n"
+                  "Connection: close\r\n\r\n").encode() + body)
+    await writer.drain()
+
+
+async def serve(broadcast, host, port):
+    server = await asyncio.start_server(StreamServer(broadcast).handle, host, port)
+    host, port = server.sockets[0].getsockname()[:2]
+    print(f"Streaming {broadcast.algorithm} on http://{host}:{port}/", file=sys.stderr)
+    async with server:
+        await asyncio.gather(server.serve_forever(), broadcast.run())
+
+
+def main(argv=None):
+    from bench import add_distribution_args, distribution_params, lookup
+
+    parser = argparse.ArgumentParser(
+        prog="sorting-visualizer.py serve",
+        description="Run a sort on this machine and stream it to any number of browsers.")
+    parser.add_argument("--host", default="127.0.0.1",
+                        help="address to listen on (default: 127.0.0.1; 0.0.0.0 for everyone)")
+    parser.add_argument("-p", "--port", type=int, default=8000)
+    parser.add_argument("-a", "--algorithm", default="Quick Sort",
+                        type=lambda name: lookup(name, ALGORITHMS))
+    parser.add_argument("-d", "--distribution", default="Uniform",
+                        type=lambda name: lookup(name, DISTRIBUTIONS))
+    parser.add_argument("-n", "--size", type=lambda text: int(float(text)), default=300)
+    parser.add_argument("-s", "--seed", type=int)
+    parser.add_argument("--speed", type=float, default=300,
+                        help="steps per second (default: 300)")
+    parser.add_argument("--loop", action="store_true",
+                        help="start over on a new array after each run")
+    parser.add_argument("-k", type=int,
+                        help="selection algorithms: how many of the smallest elements to "
+                             "select (default: n/10)")
+    add_distribution_args(parser)
+    args = parser.parse_args(argv)
+
+    if not 1 <= args.size <= MAX_SIZE:
+        parser.error(f"--size must be between 1 and {MAX_SIZE:,}")
+    if args.speed <= 0:
+        parser.error("--speed must be positive")
+    if args.k is not None and args.k < 1:
+        parser.error("-k must be at least 1")
+
+    async def start():
+        try:
+            broadcast = Broadcast(args.algorithm, args.distribution, args.size, args.seed,
+                                  args.speed, args.loop, args.k, distribution_params(args))
+        except ValueError as e:
+            parser.error(str(e))
+        await serve(broadcast, args.host, args.port)
+
+    try:
+        asyncio.run(start())
+    except OSError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+PAGE = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>Sorting Algorithm Visualizer</title>
+<style>
+  body { margin: 0; background: #0a0a1a; color: #ffffff; font: 14px 'Segoe UI', sans-serif; }
+  header { padding: 12px 20px; background: #1e1e3f; }
+  #title { color: #00d4ff; font-size: 20px; font-weight: bold; }
+  #stats { color: #888888; margin-top: 4px; }
+  canvas { display: block; width: calc(100vw - 40px); height: calc(100vh - 110px); margin: 15px 20px; }
+</style>
+</head>
+<body>
+<header><div id="title">Connecting...</div><div id="stats"></div></header>
+<canvas id="canvas"></canvas>
+<script>
+const canvas = document.getElementById("canvas");
+const ctx = canvas.getContext("2d");
+let values = [], colors = [], palette = [], background = "#12122a", max = 1, queued = false;
+
+function connect() {
+  const socket = new WebSocket(`ws://${location.host}/ws`);
+  socket.onmessage = (event) => {
+    const message = JSON.parse(event.data);
+    if (message.type === "full") {
+      values = message.values;
+      colors = message.colors;
+      palette = message.palette;
+      background = message.canvas;
+      max = values.reduce((a, b) => Math.max(a, b), 1);
+    } else {
+      for (let k = 0; k < message.i.length; k++) {
+        values[message.i[k]] = message.v[k];
+        colors[message.i[k]] = message.c[k];
+      }
+    }
+    show(message.stats);
+    if (!queued) {
+      queued = true;
+      requestAnimationFrame(draw);
+    }
+  };
+  socket.onclose = () => {
+    document.getElementById("title").textContent = "Disconnected; retrying...";
+    setTimeout(connect, 2000);
+  };
+}
+
+function show(stats) {
+  document.getElementById("title").textContent =
+    `${stats.algorithm} (${stats.distribution})${stats.done ? " - sorted" : ""}`;
+  document.getElementById("stats").textContent =
+    `Step ${stats.step.toLocaleString()} · Comparisons ${stats.comparisons.toLocaleString()} · ` +
+    `Swaps ${stats.swaps.toLocaleString()} · Writes ${stats.writes.toLocaleString()} · ` +
+    `Algorithm ${stats.seconds.toFixed(3)}s · Viewers ${stats.viewers}`;
+}
+
+function draw() {
+  queued = false;
+  const width = canvas.width = canvas.clientWidth;
+  const height = canvas.height = canvas.clientHeight;
+  ctx.fillStyle = background;
+  ctx.fillRect(0, 0, width, height);
+  const n = values.length, pad = 20;
+  if (!n) return;
+  const barWidth = (width - 2 * pad) / n, scale = (height - 2 * pad) / max;
+  if (barWidth >= 1) {
+    const gap = barWidth > 3 ? 1 : 0;
+    for (let i = 0; i < n; i++) {
+      ctx.fillStyle = palette[colors[i]];
+      ctx.fillRect(pad + i * barWidth, height - pad - values[i] * scale,
+                   barWidth - gap, values[i] * scale);
+    }
+    return;
+  }
+  // More bars than pixels: one column each, as tall as its largest value
+  // and coloured by any highlighted element in it.
+  for (let i = 0; i < n; ) {
+    const x = Math.floor(i * barWidth);
+    let top = 0, color = 0;
+    for (; i < n && Math.floor(i * barWidth) === x; i++) {
+      top = Math.max(top, values[i]);
+      if (colors[i]) color = colors[i];
+    }
+    ctx.fillStyle = palette[color];
+    ctx.fillRect(pad + x, height - pad - top * scale, 1, top * scale);
+  }
+}
+
+window.onresize = () => requestAnimationFrame(draw);
+connect();
+</script>
+</body>
+</html>
+"""
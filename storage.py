@@ -0,0 +1,101 @@
+import operator
+import sys
+from array import array
+from itertools import islice
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# "numpy" keeps elements in an int32 ndarray and falls back to array('i') when
+# NumPy is not installed; both store 4 bytes per element instead of a pointer
+# plus a Python int object per element in a list.
+STORAGES = ["list", "array", "numpy"]
+
+
+def resolve_storage(storage):
+    if storage == "numpy" and np is None:
+        print("NumPy is not installed; using array('i') storage", file=sys.stderr)
+        return "array"
+    return storage
+
+
+def make_array(values, storage="list"):
+    storage = resolve_storage(storage)
+    if storage == "numpy":
+        return np.asarray(values, dtype=np.int32)
+    if storage == "array":
+        return values if isinstance(values, array) else array('i', values)
+    return values if isinstance(values, list) else list(values)
+
+
+def clone(values):
+    # values[:] copies a list or array('i') but is only a view of an ndarray.
+    if np is not None and isinstance(values, np.ndarray):
+        return values.copy()
+    return values[:]
+
+
+def nbytes(values):
+    if np is not None and isinstance(values, np.ndarray):
+        return values.nbytes
+    if isinstance(values, array):
+        return values.itemsize * len(values)
+    return sys.getsizeof(values) + sum(map(sys.getsizeof, values))
+
+
+def is_sorted(values):
+    if np is not None and isinstance(values, np.ndarray):
+        return bool(np.all(values[:-1] <= values[1:]))
+    return all(map(operator.le, values, islice(values, 1, None)))
+
+
+def same_elements(values, original):
+    if np is not None:
+        return bool(np.array_equal(np.sort(np.asarray(values)), np.sort(np.asarray(original))))
+    return sorted(values) == sorted(original)
+
+
+def verify(values, original):
+    if not is_sorted(values):
+        raise RuntimeError("result is not sorted")
+    if not same_elements(values, original):
+        raise RuntimeError("result is not a permutation of the input")
+
+
+def verify_selection(values, original, k, ordered=False):
+    # For selection algorithms: values[:k] must be the k smallest of the
+    # input, sorted if `ordered`, otherwise with the k-th smallest last.
+    if not same_elements(values, original):
+        raise RuntimeError("result is not a permutation of the input")
+    if not k:
+        return
+    if np is not None:
+        smallest = np.sort(np.asarray(original))[:k].tolist()
+    else:
+        smallest = sorted(original)[:k]
+    head = list(values[:k])
+    if ordered and head != smallest:
+        raise RuntimeError(f"the first {k} elements are not the {k} smallest in order")
+    if sorted(head) != smallest or head[-1] != smallest[-1]:
+        raise RuntimeError(f"the first {k} elements are not the {k} smallest")
+
+
+def scale(values, factor, offset=0):
+    if np is not None:
+        return ((np.asarray(values, dtype=np.float64) - offset) * factor).tolist()
+    return [(val - offset) * factor for val in values]
+
+
+def column_extents(values, starts):
+    # Min and max of values[starts[k]:starts[k + 1]] for every k (the last
+    # bin runs to the end).
+    if np is not None:
+        values = np.asarray(values)
+        return (np.minimum.reduceat(values, starts).tolist(),
+                np.maximum.reduceat(values, starts).tolist())
+
+    ends = starts[1:] + [len(values)]
+    chunks = [values[lo:hi] for lo, hi in zip(starts, ends)]
+    return list(map(min, chunks)), list(map(max, chunks))
@@ -0,0 +1,62 @@
+# Palette and geometry shared by the Tk renderers and the offscreen
+# rasterizer in export.py, so a recorded clip looks like the live canvas.
+
+COLORS = {
+    'bar': '#00d4ff',
+    'compare': '#ff4757',
+    'swap': '#ffa502',
+    'sorted': '#2ed573',
+    'pivot': '#a55eea',
+    'bg': '#0a0a1a',
+    'canvas': '#12122a',
+    'panel': '#1e1e3f',
+    'text': '#ffffff',
+    'accent': '#00d4ff',
+    'gradient1': '#667eea',
+    'gradient2': '#764ba2',
+    # One colour per parallel worker / bucket segment.
+    'segments': ['#ff6b81', '#7bed9f', '#eccc68', '#70a1ff',
+                 '#ff9ff3', '#48dbfb', '#feca57', '#c8d6e5'],
+}
+
+PADDING = 20
+MIN_BAR_WIDTH = 3
+
+
+def uses_columns(n, canvas_width):
+    # Bars narrower than a few pixels are pointless to draw one by one;
+    # past that point switch to per-pixel-column min/max lines.
+    bars_fit = (canvas_width - 2 * PADDING) / MIN_BAR_WIDTH
+    return n > max(bars_fit, 150)
+
+
+def bar_geometry(n, canvas_width, canvas_height, max_val, min_val=0):
+    # Returns (bar width, baseline y, pixels per unit of value). Bar i spans
+    # x = PADDING + i * bar_width up to 2px short of the next bar; a value
+    # of min_val sits on the baseline.
+    bar_width = (canvas_width - 2 * PADDING) / n
+    base = canvas_height - PADDING
+    scale = (canvas_height - 2 * PADDING - 20) / max(max_val - min_val, 1)
+    return bar_width, base, scale
+
+
+def column_count(n, canvas_width):
+    return max(1, min(n, int(canvas_width - 2 * PADDING)))
+
+
+def cap_height(bar_height):
+    # The lighter cap drawn on top of each bar.
+    return min(5, bar_height * 0.1)
+
+
+def segment_color(segment):
+    segments = COLORS['segments']
+    return segments[(segment - 1) % len(segments)]
+
+
+def lighten(hex_color, factor=1.3):
+    r, g, b = tuple(int(hex_color.lstrip('#')[i:i+2], 16) for i in (0, 2, 4))
+    r = min(255, int(r * factor))
+    g = min(255, int(g * factor))
+    b = min(255, int(b * factor))
+    return f'#{r:02x}{g:02x}{b:02x}'
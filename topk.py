@@ -0,0 +1,97 @@
+import argparse
+import contextlib
+import heapq
+import sys
+from array import array
+from itertools import islice
+
+from external import DTYPES
+
+# Streaming top-k: the k smallest (or largest) values of any iterable, in one
+# pass and holding only k of them. The heap keeps the k best seen so far
+# with the worst of them at its root, so each further value costs one
+# comparison with the root, plus O(log k) when it replaces it: O(n log k)
+# time and O(k) memory however long the input is. Partial Heap Sort
+# (algorithms.partial_heap_sort) is the same algorithm played on an array.
+BUFFER_BYTES = 1 << 20
+
+
+def top_k(values, k, largest=False):
+    # Sorted ascending, or descending with largest=True.
+    sign = 1 if largest else -1
+    # heapq is a min-heap, so for the smallest the keys are negated to put
+    # the largest of them at the root.
+    values = iter(values)
+    heap = [sign * val for val in islice(values, k)]
+    heapq.heapify(heap)
+    for val in values:
+        if heap and sign * val > heap[0]:
+            heapq.heapreplace(heap, sign * val)
+    return sorted((sign * key for key in heap), reverse=largest)
+
+
+def read_text(files):
+    # Whitespace-separated integers, a line at a time.
+    for f in files:
+        for line in f:
+            for token in line.split():
+                yield int(token)
+
+
+def read_binary(files, dtype):
+    # Native-endian int32/int64 values (see external.py), a buffer at a time.
+    typecode = DTYPES[dtype]
+    for f in files:
+        while True:
+            block = f.buffer.read(BUFFER_BYTES) if hasattr(f, "buffer") else f.read(BUFFER_BYTES)
+            if not block:
+                break
+            values = array(typecode)
+            values.frombytes(block)
+            yield from values
+
+
+class Counted:
+    # Passes values through, counting them.
+
+    def __init__(self, values):
+        self.values = values
+        self.count = 0
+
+    def __iter__(self):
+        for val in self.values:
+            self.count += 1
+            yield val
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="sorting-visualizer.py topk",
+        description="Print the k smallest (or largest) integers of a stream in order, "
+                    "reading it once and keeping only k values in memory.")
+    parser.add_argument("inputs", nargs="*",
+                        help="files to read, whitespace-separated integers (default: stdin)")
+    parser.add_argument("-k", type=int, default=10, help="how many values to keep (default: 10)")
+    parser.add_argument("--largest", action="store_true", help="keep the largest instead")
+    parser.add_argument("-t", "--dtype", choices=DTYPES,
+                        help="read the inputs as binary files of this integer type instead")
+    args = parser.parse_args(argv)
+
+    if args.k < 1:
+        parser.error("-k must be at least 1")
+
+    mode = "rb" if args.dtype else "r"
+    try:
+        with contextlib.ExitStack() as stack:
+            files = [stack.enter_context(open(path, mode)) for path in args.inputs] or [sys.stdin]
+            values = read_binary(files, args.dtype) if args.dtype else read_text(files)
+            counted = Counted(values)
+            result = top_k(counted, args.k, args.largest)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+    for val in result:
+        print(val)
+    print(f"kept {len(result):,} of {counted.count:,} values", file=sys.stderr)
+    return 0
@@ -0,0 +1,244 @@
+import argparse
+import json
+import mmap
+import os
+import struct
+import sys
+import time
+import zlib
+from itertools import chain, islice
+
+from instrument import Counters
+from registry import ALGORITHMS
+from scheduler import sort_steps
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# A trace file holds one run: the initial array, every step event and how
+# long the algorithm took, so it can be played back without running the
+# sort again. Layout (all little-endian):
+#
+#   HEADER     magic, compression, metadata length, n
+#   metadata   JSON: algorithm, distribution, seed, params, k (selection only)
+#   array      n int32 values
+#   blocks     BLOCK (payload length, step count) + payload, where the
+#              payload is STEP records, compressed as a whole if asked
+#   TRAILER    total steps, algorithm time in ns, end marker
+#
+# A trace cut short (e.g. the recorder was killed) has no trailer and plays
+# up to its last complete block.
+MAGIC = b"SORTTRC1"
+END = b"TEND"
+HEADER = struct.Struct("<8sB3xII")
+BLOCK = struct.Struct("<II")
+STEP = struct.Struct("<bii")
+TRAILER = struct.Struct("<QQ4s")
+BLOCK_STEPS = 1 << 16
+COMPRESSIONS = ["none", "zlib", "zstd"]
+
+
+def compressor(compression):
+    if compression == "zlib":
+        return zlib.compress
+    if compression == "zstd":
+        if zstandard is None:
+            raise ValueError("zstd compression needs the zstandard package")
+        return zstandard.ZstdCompressor().compress
+    return bytes
+
+
+def decompressor(compression):
+    if compression == "zlib":
+        return zlib.decompress
+    if compression == "zstd":
+        if zstandard is None:
+            raise ValueError("this trace is zstd-compressed; install the zstandard package")
+        return zstandard.ZstdDecompressor().decompress
+    return None
+
+
+class TraceWriter:
+    def __init__(self, path, array, algorithm, distribution=None, seed=None, params=None,
+                 compression="zlib", block_steps=BLOCK_STEPS, k=None):
+        self.compress = compressor(compression)
+        self.block_steps = block_steps
+        self.pending = []
+        self.total_steps = 0
+        self.algorithm_ns = 0
+
+        meta = json.dumps({"algorithm": algorithm, "distribution": distribution, "seed": seed,
+                           "params": params or {}, "k": k}).encode()
+        self.file = open(path, "wb")
+        self.file.write(HEADER.pack(MAGIC, COMPRESSIONS.index(compression), len(meta), len(array)))
+        self.file.write(meta)
+        self.file.write(struct.pack(f"<{len(array)}i", *array))
+
+    def write(self, steps):
+        self.pending.extend(steps)
+        while len(self.pending) >= self.block_steps:
+            self.flush(self.pending[:self.block_steps])
+            del self.pending[:self.block_steps]
+
+    def flush(self, steps):
+        # One struct call packs the whole block.
+        payload = self.compress(struct.pack("<" + "bii" * len(steps), *chain.from_iterable(steps)))
+        self.file.write(BLOCK.pack(len(payload), len(steps)))
+        self.file.write(payload)
+        self.total_steps += len(steps)
+
+    def close(self, complete=True):
+        # An incomplete trace keeps its steps but gets no trailer.
+        if self.pending:
+            self.flush(self.pending)
+            self.pending = []
+        if complete:
+            self.file.write(TRAILER.pack(self.total_steps, self.algorithm_ns, END))
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        self.close(complete=exc_type is None)
+
+
+class TraceReader:
+    # Reads the header, metadata, array and trailer up front; steps() then
+    # streams the blocks from a memory map.
+
+    def __init__(self, path):
+        self.path = path
+        size = os.path.getsize(path)
+        with open(path, "rb") as f:
+            head = f.read(HEADER.size)
+            if len(head) < HEADER.size or head[:8] != MAGIC:
+                raise ValueError(f"{path} is not a sort trace")
+            _, compression, meta_len, n = HEADER.unpack(head)
+            if compression >= len(COMPRESSIONS):
+                raise ValueError(f"{path}: unknown compression {compression}")
+            self.compression = COMPRESSIONS[compression]
+            meta = f.read(meta_len)
+            values = f.read(4 * n)
+            if len(meta) < meta_len or len(values) < 4 * n:
+                raise ValueError(f"{path}: truncated before the first step")
+            self.meta = json.loads(meta)
+            self.array = list(struct.unpack(f"<{n}i", values))
+            self.offset = f.tell()
+
+            # No trailer: a trace cut short, or still being written.
+            self.end = size
+            self.total_steps = None
+            self.algorithm_ns = 0
+            if size - self.offset >= TRAILER.size:
+                f.seek(size - TRAILER.size)
+                total, algorithm_ns, marker = TRAILER.unpack(f.read(TRAILER.size))
+                if marker == END:
+                    self.end = size - TRAILER.size
+                    self.total_steps = total
+                    self.algorithm_ns = algorithm_ns
+
+    @property
+    def algorithm(self):
+        return self.meta.get("algorithm")
+
+    def blocks(self):
+        # Each block's steps as a list of (op, a, b) tuples.
+        decompress = decompressor(self.compression)
+        with open(self.path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            offset = self.offset
+            while offset + BLOCK.size <= self.end:
+                length, count = BLOCK.unpack_from(mm, offset)
+                offset += BLOCK.size
+                if offset + length > self.end:
+                    return
+                if decompress is None:
+                    with memoryview(mm)[offset:offset + length] as payload:
+                        steps = list(STEP.iter_unpack(payload))
+                else:
+                    steps = list(STEP.iter_unpack(decompress(mm[offset:offset + length])))
+                offset += length
+                yield steps
+
+    def steps(self):
+        yield from chain.from_iterable(self.blocks())
+
+
+def record(algorithm, array, path, distribution=None, seed=None, params=None,
+           compression="zlib", k=None):
+    # Runs `algorithm` on `array` (sorting it) and writes the trace. Only the
+    # time spent producing steps counts as algorithm time, not the writing.
+    # `k` is for the selection algorithms and is ignored by the rest.
+    spec = ALGORITHMS.spec(algorithm)
+    k = spec.selected(len(array), k) if spec.partial else None
+    with TraceWriter(path, array, algorithm, distribution, seed, params, compression,
+                     k=k) as writer:
+        steps = sort_steps(algorithm, array, k=k, poll=False)
+        while True:
+            start = time.perf_counter_ns()
+            block = list(islice(steps, BLOCK_STEPS))
+            writer.algorithm_ns += time.perf_counter_ns() - start
+            if not block:
+                break
+            writer.write(block)
+    return writer
+
+
+def main(argv=None):
+    from bench import add_distribution_args, distribution_params, lookup
+    from distributions import DISTRIBUTIONS, generate
+
+    parser = argparse.ArgumentParser(
+        prog="sorting-visualizer.py trace",
+        description="Record a sort to a compact binary trace, or describe one. "
+                    "Play a trace back with: sorting-visualizer.py --trace FILE")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    rec = commands.add_parser("record", help="run a sort and write its trace")
+    rec.add_argument("output")
+    rec.add_argument("-a", "--algorithm", default="Quick Sort",
+                     type=lambda name: lookup(name, ALGORITHMS))
+    rec.add_argument("-d", "--distribution", default="Uniform",
+                     type=lambda name: lookup(name, DISTRIBUTIONS))
+    rec.add_argument("-n", "--size", type=lambda text: int(float(text)), default=1000)
+    rec.add_argument("-s", "--seed", type=int, default=0)
+    add_distribution_args(rec)
+    rec.add_argument("-c", "--compression", choices=COMPRESSIONS, default="zlib")
+    rec.add_argument("-k", type=int,
+                     help="selection algorithms: how many of the smallest elements to select")
+
+    info = commands.add_parser("info", help="print a trace's metadata and step counts")
+    info.add_argument("trace")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "record":
+        params = {key: val for key, val in distribution_params(args).items() if val is not None}
+        try:
+            array = generate(args.distribution, args.size, args.seed, "array", **params)
+            writer = record(args.algorithm, array, args.output, args.distribution, args.seed,
+                            params, args.compression, args.k)
+        except (OSError, ValueError) as e:
+            print(f"Error: {e}", file=sys.stderr)
+            return 1
+        size = os.path.getsize(args.output)
+        print(f"{args.output}: {args.algorithm}, n={args.size:,}, {writer.total_steps:,} steps, "
+              f"{size:,} bytes ({size / max(1, writer.total_steps):.2f} per step)", file=sys.stderr)
+        return 0
+
+    try:
+        reader = TraceReader(args.trace)
+        counters = Counters()
+        for block in reader.blocks():
+            counters.consume(block)
+    except (OSError, ValueError, struct.error, zlib.error) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    result = dict(reader.meta, n=len(reader.array), compression=reader.compression,
+                  complete=reader.total_steps is not None,
+                  algorithm_seconds=reader.algorithm_ns / 1e9, **counters.as_dict())
+    json.dump(result, sys.stdout, indent=2)
+    sys.stdout.write("\n")
+    return 0
@@ -0,0 +1,85 @@
+from storage import np
+
+# NumPy versions of the non-comparison sorts, used by the benchmark for
+# "numpy" storage. They do the same passes as the generators in
+# algorithms.py, but each pass is a handful of whole-array operations, so
+# they sort an int32 ndarray in place without producing step events.
+
+
+def counting_sort_np(values):
+    if not len(values):
+        return
+    low = values.min()
+    counts = np.bincount(values.astype(np.int64) - low)
+    values[:] = np.repeat(np.arange(low, low + len(counts), dtype=values.dtype), counts)
+
+
+def _digit_dtype(base):
+    # argsort(kind='stable') is a radix sort for 8- and 16-bit keys.
+    if base <= 1 << 8:
+        return np.uint8
+    if base <= 1 << 16:
+        return np.uint16
+    return np.int64
+
+
+def lsd_radix_sort_np(values, base=10):
+    if len(values) < 2:
+        return
+    keys = values.astype(np.int64) - values.min()
+    span = int(keys.max())
+    dtype = _digit_dtype(base)
+
+    place = 1
+    while place <= span:
+        # One stable pass per digit, like the counting scatter.
+        order = np.argsort((keys // place % base).astype(dtype), kind='stable')
+        keys = keys[order]
+        place *= base
+    values[:] = keys + values.min()
+
+
+def msd_radix_sort_np(values, base=10):
+    # Breadth first: every bucket of one level is split by the next digit in
+    # the same pass, by stably sorting on (bucket, digit). A level is skipped
+    # once every bucket holds a single element.
+    n = len(values)
+    if n < 2:
+        return
+    low = values.min()
+    keys = values.astype(np.int64) - low
+    span = int(keys.max())
+    place = 1
+    while place * base <= span:
+        place *= base
+
+    group = np.zeros(n, dtype=np.int64)
+    while place and group[-1] < n - 1:
+        digit = keys // place % base
+        order = np.argsort(group * base + digit, kind='stable')
+        keys, digit, group = keys[order], digit[order], group[order]
+        # A new bucket starts wherever the (bucket, digit) pair changes.
+        starts = np.empty(n, dtype=bool)
+        starts[0] = False
+        starts[1:] = (group[1:] != group[:-1]) | (digit[1:] != digit[:-1])
+        group = np.cumsum(starts)
+        place //= base
+    values[:] = keys + low
+
+
+def bucket_sort_np(values, buckets=None):
+    n = len(values)
+    if n < 2:
+        return
+    buckets = buckets or max(1, int(n ** 0.5))
+    low = int(values.min())
+    width = int(values.max()) - low + 1
+    index = (values.astype(np.int64) - low) * buckets // width
+    order = np.argsort(index, kind='stable')
+    scattered = values[order]
+    bounds = np.searchsorted(index[order], np.arange(buckets + 1))
+    for lo, hi in zip(bounds[:-1].tolist(), bounds[1:].tolist()):
+        if hi - lo > 1:
+            scattered[lo:hi].sort()
+    values[:] = scattered
+